@@ -3,72 +3,136 @@ AI Agents for website analysis
 Placeholder implementation - to be developed
 """
 
+import asyncio
+import functools
 import logging
-from typing import Dict, Any, Optional
+import os
+import sys
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.utils.models import PageContent, EvaluationResult, EvaluationType
 
 logger = logging.getLogger(__name__)
 
+def _error_result(agent: "BaseAgent", page: PageContent, error: Exception) -> EvaluationResult:
+    """Zero-score result recorded in place of an agent that raised"""
+    return EvaluationResult(
+        url=page.url,
+        evaluation_type=agent.evaluation_type,
+        score=0,
+        issues=[f"Agent error: {error}"],
+        evaluator_agent=agent.name
+    )
+
+def safe_evaluate(fn):
+    """Turn any exception raised by an agent evaluation into a zero-score error result"""
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrap(self, content, context="", screenshot=None):
+            try:
+                return await fn(self, content, context, screenshot)
+            except Exception as e:
+                self.logger.exception("Error in %s agent", self.name)
+                return _error_result(self, content, e)
+        return async_wrap
+    
+    @functools.wraps(fn)
+    def wrap(self, content, context="", screenshot=None):
+        try:
+            return fn(self, content, context, screenshot)
+        except Exception as e:
+            self.logger.exception("Error in %s agent", self.name)
+            return _error_result(self, content, e)
+    return wrap
+
 class BaseAgent:
-    """Base class for all AI agents"""
+    """Base class for all AI agents; subclasses declare NAME and EVAL_TYPE and override _assess"""
+    
+    NAME: str = "Base"
+    EVAL_TYPE: EvaluationType = EvaluationType.CONTENT_QUALITY
+    
+    def __init__(self):
+        self.name = self.NAME
+        self.evaluation_type = self.EVAL_TYPE
+        self.logger = logging.getLogger(f"{__name__}.{self.name}")
+        # Built once and shared read-only across every evaluation
+        self._result_template: Mapping[str, Any] = MappingProxyType({
+            "evaluation_type": self.evaluation_type,
+            "evaluator_agent": self.name
+        })
+    
+    def _assess(self, content: PageContent, context: str = "",
+                screenshot: Optional[str] = None) -> Dict[str, Any]:
+        """Agent-specific scoring; returns score, issues, recommendations and details"""
+        return {"score": 0.0, "details": {"feedback": f"Placeholder evaluation from {self.name}"}}
     
-    def __init__(self, name: str):
-        self.name = name
-        self.logger = logging.getLogger(f"{__name__}.{name}")
+    @safe_evaluate
+    def evaluate_sync(self, content: PageContent, context: str = "",
+                      screenshot: Optional[str] = None) -> EvaluationResult:
+        """Evaluate content without going through the event loop"""
+        self.logger.info("%s agent evaluating content", self.name)
+        return EvaluationResult(
+            url=content.url,
+            **self._result_template,
+            **self._assess(content, context, screenshot)
+        )
     
-    async def evaluate(self, content: Dict[str, Any]) -> Dict[str, Any]:
+    @safe_evaluate
+    async def evaluate(self, content: PageContent, context: str = "",
+                       screenshot: Optional[str] = None) -> EvaluationResult:
         """Evaluate content and return results"""
-        self.logger.info(f"{self.name} agent evaluating content")
-        return {
-            "agent": self.name,
-            "score": 0.0,
-            "feedback": f"Placeholder evaluation from {self.name}",
-            "recommendations": []
-        }
+        return self.evaluate_sync(content, context=context, screenshot=screenshot)
 
 class ContentQualityAgent(BaseAgent):
     """Agent for evaluating content quality"""
     
-    def __init__(self):
-        super().__init__("ContentQuality")
+    NAME = "ContentQuality"
+    EVAL_TYPE = EvaluationType.CONTENT_QUALITY
 
 class DesignAndLayoutAgent(BaseAgent):
     """Agent for evaluating design and layout"""
     
-    def __init__(self):
-        super().__init__("DesignAndLayout")
+    NAME = "DesignAndLayout"
+    EVAL_TYPE = EvaluationType.DESIGN_ISSUES
 
 class AccessibilityAgent(BaseAgent):
     """Agent for evaluating accessibility"""
     
-    def __init__(self):
-        super().__init__("Accessibility")
+    NAME = "Accessibility"
+    EVAL_TYPE = EvaluationType.ACCESSIBILITY
 
 class SEOAgent(BaseAgent):
     """Agent for evaluating SEO"""
     
-    def __init__(self):
-        super().__init__("SEO")
+    NAME = "SEO"
+    EVAL_TYPE = EvaluationType.SEO
 
 class TechnicalPerformanceAgent(BaseAgent):
     """Agent for evaluating technical performance"""
     
-    def __init__(self):
-        super().__init__("TechnicalPerformance")
+    NAME = "TechnicalPerformance"
+    EVAL_TYPE = EvaluationType.TECHNICAL
 
 class ConversionOptimizationAgent(BaseAgent):
     """Agent for evaluating conversion optimization"""
     
-    def __init__(self):
-        super().__init__("ConversionOptimization")
+    NAME = "ConversionOptimization"
+    EVAL_TYPE = EvaluationType.CONTENT_QUALITY
 
 class SecurityAgent(BaseAgent):
     """Agent for evaluating security"""
     
-    def __init__(self):
-        super().__init__("Security")
+    NAME = "Security"
+    EVAL_TYPE = EvaluationType.TECHNICAL
 
 class BrandConsistencyAgent(BaseAgent):
     """Agent for evaluating brand consistency"""
     
-    def __init__(self):
-        super().__init__("BrandConsistency")
+    NAME = "BrandConsistency"
+    EVAL_TYPE = EvaluationType.DESIGN_ISSUES
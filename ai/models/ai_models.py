@@ -2,11 +2,46 @@
 AI Analysis Data Models
 """
 
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import sys
+import time
+from array import array
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, computed_field, field_validator
+from typing import List, Dict, Any, Optional, Tuple, Union
+from datetime import datetime, timezone
 from enum import Enum
 
+def _ns_to_datetime(timestamp_ns: int) -> datetime:
+    """Convert an epoch-nanoseconds timestamp to an aware UTC datetime"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc)
+
+def _field_docs(**docs: str):
+    """json_schema_extra hook that fills property descriptions when a JSON/OpenAPI schema is generated"""
+    def add_docs(schema: Dict[str, Any]) -> None:
+        for name, prop in schema.get("properties", {}).items():
+            if name in docs:
+                prop.setdefault("description", docs[name])
+    return add_docs
+
+class AIBaseModel(BaseModel):
+    """Base for AI models: unknown keys are dropped and attribute writes are not re-validated"""
+    model_config = ConfigDict(
+        extra="ignore",
+        validate_assignment=False,
+        ser_json_timedelta="iso8601",
+        ser_json_bytes="utf8",
+        # Validators are compiled on first use or by rebuild_ai_models() at worker start
+        defer_build=True
+    )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Python-mode dump for persistence (datetimes stay datetimes for MongoDB)"""
+        return self.model_dump(mode="python")
+    
+    def to_json(self) -> str:
+        """Compact JSON straight from pydantic-core, omitting unset optionals such as raw_ai_response"""
+        return self.model_dump_json(by_alias=True, exclude_none=True)
+
 class AnalysisType(str, Enum):
     CONTENT_QUALITY = "content_quality"
     SEO_ANALYSIS = "seo_analysis"
@@ -14,89 +49,315 @@ class AnalysisType(str, Enum):
     TECHNICAL_ANALYSIS = "technical_analysis"
     ACCESSIBILITY = "accessibility"
 
-class ContentQualityScore(BaseModel):
-    score: int = Field(..., ge=0, le=100, description="Content quality score (0-100)")
-    assessment: str = Field(..., description="Brief assessment of content quality")
-    strengths: List[str] = Field(default_factory=list, description="Content strengths")
-    weaknesses: List[str] = Field(default_factory=list, description="Content weaknesses")
-
-class SEOAnalysis(BaseModel):
-    title_quality: str = Field(..., description="Assessment of page title quality")
-    content_relevance: str = Field(..., description="Content relevance assessment")
-    keyword_density: str = Field(..., description="Keyword density analysis")
-    recommendations: List[str] = Field(default_factory=list, description="SEO recommendations")
-
-class UserExperienceAnalysis(BaseModel):
-    readability: str = Field(..., description="Content readability assessment")
-    structure: str = Field(..., description="Page structure assessment")
-    navigation: str = Field(..., description="Navigation assessment")
-    improvements: List[str] = Field(default_factory=list, description="UX improvement suggestions")
-
-class TechnicalAnalysis(BaseModel):
-    html_structure: str = Field(..., description="HTML structure assessment")
-    accessibility: str = Field(..., description="Accessibility assessment")
-    performance_impact: str = Field(..., description="Performance impact assessment")
-
-class AIAnalysisResult(BaseModel):
-    page_url: str = Field(..., description="URL of the analyzed page")
-    page_title: str = Field(..., description="Title of the analyzed page")
-    analysis_timestamp: datetime = Field(default_factory=datetime.utcnow)
-    word_count: int = Field(..., description="Word count of the page")
-    page_type: str = Field(..., description="Type of page (content, product, etc.)")
+class ChangeType(str, Enum):
+    NEW = "new"
+    REMOVED = "removed"
+    MODIFIED = "modified"
+
+def _intern_str(value: Any) -> Any:
+    """Intern short, highly repeated strings (model names, page types) so results share one copy"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class ContentQualityScore(AIBaseModel):
+    model_config = ConfigDict(frozen=True, json_schema_extra=_field_docs(
+        score="Content quality score (0-100)",
+        assessment="Brief assessment of content quality",
+        strengths="Content strengths",
+        weaknesses="Content weaknesses"
+    ))
+    
+    score: int = Field(..., ge=0, le=100)
+    assessment: str
+    strengths: Tuple[str, ...] = ()
+    weaknesses: Tuple[str, ...] = ()
+
+class SEOAnalysis(AIBaseModel):
+    model_config = ConfigDict(frozen=True, json_schema_extra=_field_docs(
+        title_quality="Assessment of page title quality",
+        content_relevance="Content relevance assessment",
+        keyword_density="Keyword density analysis",
+        recommendations="SEO recommendations"
+    ))
+    
+    title_quality: str
+    content_relevance: str
+    keyword_density: str
+    recommendations: Tuple[str, ...] = ()
+
+class UserExperienceAnalysis(AIBaseModel):
+    model_config = ConfigDict(frozen=True, json_schema_extra=_field_docs(
+        readability="Content readability assessment",
+        structure="Page structure assessment",
+        navigation="Navigation assessment",
+        improvements="UX improvement suggestions"
+    ))
+    
+    readability: str
+    structure: str
+    navigation: str
+    improvements: Tuple[str, ...] = ()
+
+class TechnicalAnalysis(AIBaseModel):
+    model_config = ConfigDict(frozen=True, json_schema_extra=_field_docs(
+        html_structure="HTML structure assessment",
+        accessibility="Accessibility assessment",
+        performance_impact="Performance impact assessment"
+    ))
+    
+    html_structure: str
+    accessibility: str
+    performance_impact: str
+
+class AIAnalysisResult(AIBaseModel):
+    model_config = ConfigDict(json_schema_extra=_field_docs(
+        page_url="URL of the analyzed page",
+        analysis_timestamp_ns="Analysis time in nanoseconds since the epoch",
+        page_title="Title of the analyzed page",
+        word_count="Word count of the page",
+        page_type="Type of page (content, product, etc.)",
+        content_quality="Content quality analysis",
+        seo_analysis="SEO analysis results",
+        user_experience="User experience analysis",
+        technical_analysis="Technical analysis results",
+        overall_recommendations="Overall recommendations",
+        raw_ai_response="Raw AI response for debugging",
+        ai_model="AI model used for analysis",
+        processing_time="Time taken to process (seconds)"
+    ))
+    
+    page_url: str
+    page_title: str
+    analysis_timestamp_ns: int = Field(default_factory=time.time_ns)
+    word_count: int
+    page_type: str
     
     # AI Analysis Results
-    content_quality: ContentQualityScore = Field(..., description="Content quality analysis")
-    seo_analysis: SEOAnalysis = Field(..., description="SEO analysis results")
-    user_experience: UserExperienceAnalysis = Field(..., description="User experience analysis")
-    technical_analysis: TechnicalAnalysis = Field(..., description="Technical analysis results")
-    overall_recommendations: List[str] = Field(default_factory=list, description="Overall recommendations")
+    content_quality: ContentQualityScore
+    seo_analysis: SEOAnalysis
+    user_experience: UserExperienceAnalysis
+    technical_analysis: TechnicalAnalysis
+    overall_recommendations: Tuple[str, ...] = ()
     
     # Raw AI Response
-    raw_ai_response: Optional[str] = Field(None, description="Raw AI response for debugging")
-    ai_model: str = Field(default="gpt-3.5-turbo", description="AI model used for analysis")
-    processing_time: Optional[float] = Field(None, description="Time taken to process (seconds)")
-
-class ContentChange(BaseModel):
-    url: str = Field(..., description="URL of the changed page")
-    title: str = Field(..., description="Page title")
-    change_type: str = Field(..., description="Type of change (new, removed, modified)")
-    word_count_change: int = Field(default=0, description="Change in word count")
-    content_changed: bool = Field(default=False, description="Whether content changed")
-    ai_analysis_changed: bool = Field(default=False, description="Whether AI analysis changed")
-    change_summary: Optional[str] = Field(None, description="AI-generated change summary")
-
-class ContentComparisonResult(BaseModel):
-    comparison_timestamp: datetime = Field(default_factory=datetime.utcnow)
-    current_run_id: str = Field(..., description="Current analysis run ID")
-    previous_run_id: str = Field(..., description="Previous analysis run ID")
+    raw_ai_response: Optional[str] = None
+    ai_model: str = "gpt-4o-mini"
+    processing_time: Optional[float] = None
+    
+    _intern_repeated = field_validator("page_type", "ai_model", mode="before")(_intern_str)
+    
+    @computed_field
+    @property
+    def analysis_timestamp(self) -> datetime:
+        """When the analysis was produced; only materialized when the result is dumped"""
+        return _ns_to_datetime(self.analysis_timestamp_ns)
+
+class ContentChange(AIBaseModel):
+    model_config = ConfigDict(json_schema_extra=_field_docs(
+        url="URL of the changed page",
+        title="Page title",
+        change_type="Type of change (new, removed, modified)",
+        word_count_change="Change in word count",
+        content_changed="Whether content changed",
+        ai_analysis_changed="Whether AI analysis changed",
+        change_summary="AI-generated change summary"
+    ))
+    
+    url: str
+    title: str
+    change_type: ChangeType
+    word_count_change: int = 0
+    content_changed: bool = False
+    ai_analysis_changed: bool = False
+    change_summary: Optional[str] = None
+
+@lru_cache(maxsize=None)
+def change_list_adapter() -> TypeAdapter:
+    """Validator for a whole list of ContentChange records, built once on first use"""
+    return TypeAdapter(List[ContentChange])
+
+class ContentChangeTable:
+    """Column-oriented store of content changes; numeric columns are packed C arrays for whole-run aggregation"""
+    
+    _CHANGE_TYPES = tuple(ChangeType)
+    _CHANGE_TYPE_CODES = {change_type: code for code, change_type in enumerate(_CHANGE_TYPES)}
+    
+    __slots__ = ("urls", "titles", "change_type_codes", "word_count_change",
+                 "content_changed", "ai_analysis_changed", "change_summaries")
+    
+    def __init__(self):
+        self.urls: List[str] = []
+        self.titles: List[str] = []
+        self.change_type_codes = array("b")
+        self.word_count_change = array("q")
+        self.content_changed = array("b")
+        self.ai_analysis_changed = array("b")
+        self.change_summaries: List[Optional[str]] = []
+    
+    def __len__(self) -> int:
+        return len(self.urls)
+    
+    def append(self, url: str, title: str, change_type: ChangeType, word_count_change: int = 0,
+               content_changed: bool = False, ai_analysis_changed: bool = False,
+               change_summary: Optional[str] = None):
+        """Add one change as a row across the columns"""
+        self.urls.append(url)
+        self.titles.append(title)
+        self.change_type_codes.append(self._CHANGE_TYPE_CODES[ChangeType(change_type)])
+        self.word_count_change.append(word_count_change)
+        self.content_changed.append(content_changed)
+        self.ai_analysis_changed.append(ai_analysis_changed)
+        self.change_summaries.append(change_summary)
+    
+    @classmethod
+    def from_records(cls, records: List[ContentChange]) -> "ContentChangeTable":
+        """Build a table from ContentChange records"""
+        table = cls()
+        for record in records:
+            table.append(record.url, record.title, record.change_type, record.word_count_change,
+                         record.content_changed, record.ai_analysis_changed, record.change_summary)
+        return table
+    
+    def to_records(self) -> List[ContentChange]:
+        """Materialize the rows as ContentChange records (columns are already validated)"""
+        change_types = self._CHANGE_TYPES
+        return [
+            ContentChange.model_construct(
+                url=url,
+                title=title,
+                change_type=change_types[code],
+                word_count_change=word_count_change,
+                content_changed=bool(content_changed),
+                ai_analysis_changed=bool(ai_analysis_changed),
+                change_summary=change_summary
+            )
+            for url, title, code, word_count_change, content_changed, ai_analysis_changed, change_summary in zip(
+                self.urls, self.titles, self.change_type_codes, self.word_count_change,
+                self.content_changed, self.ai_analysis_changed, self.change_summaries
+            )
+        ]
+    
+    def change_type_counts(self) -> Dict[ChangeType, int]:
+        """Row count per change type, one C-level scan of the code column per type"""
+        codes = self.change_type_codes
+        return {change_type: codes.count(code) for code, change_type in enumerate(self._CHANGE_TYPES)}
+    
+    def total_word_count_change(self) -> int:
+        """Net word count change across all rows"""
+        return sum(self.word_count_change)
+    
+    def content_changed_count(self) -> int:
+        """Number of rows whose content changed"""
+        return self.content_changed.count(1)
+    
+    def ai_analysis_changed_count(self) -> int:
+        """Number of rows whose AI analysis changed"""
+        return self.ai_analysis_changed.count(1)
+
+class ChangesSummary(AIBaseModel):
+    model_config = ConfigDict(frozen=True, json_schema_extra=_field_docs(
+        new_pages_count="Number of pages only in the current run",
+        removed_pages_count="Number of pages only in the previous run",
+        modified_pages_count="Number of pages present in both runs that changed",
+        content_changed_count="Modified pages whose HTML or text changed",
+        ai_analysis_changed_count="Modified pages whose AI analysis changed"
+    ))
+    
+    new_pages_count: int = 0
+    removed_pages_count: int = 0
+    modified_pages_count: int = 0
+    content_changed_count: int = 0
+    ai_analysis_changed_count: int = 0
+
+class ContentComparisonResult(AIBaseModel):
+    model_config = ConfigDict(json_schema_extra=_field_docs(
+        comparison_timestamp_ns="Comparison time in nanoseconds since the epoch",
+        current_run_id="Current analysis run ID",
+        previous_run_id="Previous analysis run ID",
+        new_pages="URLs of new pages",
+        removed_pages="URLs of removed pages",
+        modified_pages="Modified pages with details",
+        total_pages_compared="Total number of pages compared",
+        changes_summary="Summary of changes",
+        overall_change_assessment="AI assessment of overall changes",
+        impact_analysis="AI analysis of change impact",
+        recommendations="AI recommendations based on changes",
+        ai_model="AI model used for comparison",
+        processing_time="Time taken to process comparison"
+    ))
+    
+    comparison_timestamp_ns: int = Field(default_factory=time.time_ns)
+    current_run_id: str
+    previous_run_id: str
     
     # Change Detection
-    new_pages: List[str] = Field(default_factory=list, description="URLs of new pages")
-    removed_pages: List[str] = Field(default_factory=list, description="URLs of removed pages")
-    modified_pages: List[ContentChange] = Field(default_factory=list, description="Modified pages with details")
+    new_pages: Tuple[str, ...] = ()
+    removed_pages: Tuple[str, ...] = ()
+    modified_pages: List[ContentChange] = Field(default_factory=list)
     
     # Summary Statistics
-    total_pages_compared: int = Field(..., description="Total number of pages compared")
-    changes_summary: Dict[str, int] = Field(..., description="Summary of changes")
+    total_pages_compared: int
+    changes_summary: ChangesSummary
     
     # AI-Generated Insights
-    overall_change_assessment: Optional[str] = Field(None, description="AI assessment of overall changes")
-    impact_analysis: Optional[str] = Field(None, description="AI analysis of change impact")
-    recommendations: List[str] = Field(default_factory=list, description="AI recommendations based on changes")
+    overall_change_assessment: Optional[str] = None
+    impact_analysis: Optional[str] = None
+    recommendations: Tuple[str, ...] = ()
     
     # Technical Details
-    ai_model: str = Field(default="gpt-3.5-turbo", description="AI model used for comparison")
-    processing_time: Optional[float] = Field(None, description="Time taken to process comparison")
-
-class AIAnalysisRequest(BaseModel):
-    run_id: str = Field(..., description="Analysis run ID")
-    page_urls: Optional[List[str]] = Field(None, description="Specific pages to analyze (if None, analyze all)")
-    analysis_types: List[AnalysisType] = Field(default_factory=lambda: list(AnalysisType), description="Types of analysis to perform")
-    ai_model: str = Field(default="gpt-3.5-turbo", description="AI model to use")
-    max_tokens: int = Field(default=1500, description="Maximum tokens for AI response")
-
-class ContentComparisonRequest(BaseModel):
-    current_run_id: str = Field(..., description="Current analysis run ID")
-    previous_run_id: str = Field(..., description="Previous analysis run ID")
-    include_ai_insights: bool = Field(default=True, description="Whether to include AI-generated insights")
-    ai_model: str = Field(default="gpt-3.5-turbo", description="AI model to use for comparison")
+    ai_model: str = "gpt-4o-mini"
+    processing_time: Optional[float] = None
+    
+    _intern_repeated = field_validator("ai_model", mode="before")(_intern_str)
+    
+    @computed_field
+    @property
+    def comparison_timestamp(self) -> datetime:
+        """When the comparison was produced; only materialized when the result is dumped"""
+        return _ns_to_datetime(self.comparison_timestamp_ns)
+    
+    @staticmethod
+    def load_modified_pages(data: Union[bytes, str, List[Dict[str, Any]]]) -> List[ContentChange]:
+        """Validate serialized modified-page records (JSON or already-decoded dicts) in a single pass"""
+        if isinstance(data, (bytes, str)):
+            return change_list_adapter().validate_json(data)
+        return change_list_adapter().validate_python(data)
+
+class AIAnalysisRequest(AIBaseModel):
+    model_config = ConfigDict(json_schema_extra=_field_docs(
+        run_id="Analysis run ID",
+        page_urls="Specific pages to analyze (if None, analyze all)",
+        analysis_types="Types of analysis to perform",
+        ai_model="AI model to use",
+        max_tokens="Maximum tokens for AI response"
+    ))
+    
+    run_id: str
+    page_urls: Optional[List[str]] = None
+    analysis_types: List[AnalysisType] = Field(default_factory=lambda: list(AnalysisType))
+    ai_model: str = "gpt-4o-mini"
+    max_tokens: int = 800
+
+class ContentComparisonRequest(AIBaseModel):
+    model_config = ConfigDict(json_schema_extra=_field_docs(
+        current_run_id="Current analysis run ID",
+        previous_run_id="Previous analysis run ID",
+        include_ai_insights="Whether to include AI-generated insights",
+        ai_model="AI model to use for comparison"
+    ))
+    
+    current_run_id: str
+    previous_run_id: str
+    include_ai_insights: bool = True
+    ai_model: str = "gpt-4o-mini"
+
+AI_MODELS = (
+    ContentQualityScore, SEOAnalysis, UserExperienceAnalysis, TechnicalAnalysis,
+    AIAnalysisResult, ContentChange, ChangesSummary, ContentComparisonResult,
+    AIAnalysisRequest, ContentComparisonRequest
+)
+
+def rebuild_ai_models():
+    """Compile every AI model's validator and serializer up front (call once at process start)"""
+    for model in AI_MODELS:
+        model.model_rebuild(force=True)
+    change_list_adapter()
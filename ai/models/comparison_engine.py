@@ -2,37 +2,122 @@
 AI-Powered Content Comparison Engine
 """
 
-import openai
-import json
+import httpx
+import orjson
 import logging
 import time
 import os
 import sys
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, InternalServerError
+from tenacity import AsyncRetrying, retry_if_exception_type, wait_random_exponential, stop_after_attempt
 
 # Add project root to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from .ai_models import ContentComparisonResult, ContentChange, AIAnalysisResult
+from .llm_cache import get_llm_cache
+from .llm_json import collect_json_stream, parse_llm_json
+from .ai_models import ContentComparisonResult, ContentChangeTable, ChangeType, ChangesSummary, AIAnalysisResult
 from backend.utils.config import settings
+from backend.utils.hashing import content_fingerprint, json_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# System message shared by every call; only the user message is built per request
+_SYSTEM_PROMPT_COMPARISON = {
+    "role": "system",
+    "content": "You are an expert web content strategist. Provide strategic insights about website changes and their impact on business goals, SEO, and user experience. Respond in JSON."
+}
+
+# JSON schema for the strategic insights; enforced server-side through structured outputs
+COMPARISON_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "comparison_insights",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "overall_assessment": {
+                    "type": "string",
+                    "description": "Comprehensive assessment of the actual content changes and their impact on the website"
+                },
+                "impact_analysis": {
+                    "type": "string",
+                    "description": "Analysis of how these HTML content changes affect user experience, SEO, and business goals"
+                },
+                "recommendations": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Five strategic recommendations based on content changes"
+                }
+            },
+            "required": ["overall_assessment", "impact_analysis", "recommendations"],
+            "additionalProperties": False
+        }
+    }
+}
+
+@lru_cache(maxsize=1024)
+def _render_comparison_prompt(new_pages_count: int, removed_pages_count: int, modified_pages_count: int,
+                              total_pages_compared: int, sample_current: tuple, sample_previous: tuple) -> str:
+    """Render the comparison prompt; memoized so retries and repeated comparisons skip the JSON encoding"""
+    sample_current = [dict(items) for items in sample_current]
+    sample_previous = [dict(items) for items in sample_previous]
+    
+    prompt = f"""
+You are an expert web content strategist. Analyze the changes between two website analysis runs and provide strategic insights based on actual HTML content changes.
+
+CHANGE SUMMARY:
+- New Pages: {new_pages_count}
+- Removed Pages: {removed_pages_count}
+- Modified Pages: {modified_pages_count}
+- Total Pages Compared: {total_pages_compared}
+
+SAMPLE CURRENT PAGES (showing actual content):
+{orjson.dumps(sample_current, option=orjson.OPT_INDENT_2).decode()[:2000]}
+
+SAMPLE PREVIOUS PAGES (showing actual content):
+{orjson.dumps(sample_previous, option=orjson.OPT_INDENT_2).decode()[:2000]}
+
+GUIDELINES:
+1. Focus on actual HTML content changes, not just structure or quality metrics
+2. Analyze the impact of content additions, removals, and modifications
+3. Consider SEO implications of content changes
+4. Assess user experience impact of content modifications
+5. Provide actionable recommendations based on content strategy
+6. Consider the overall website content health and growth trajectory
+7. Keep recommendations specific and implementable based on actual content changes
+"""
+    
+    return prompt
+
 class ComparisonEngine:
     """AI-powered content comparison between analysis runs"""
     
-    def __init__(self, model: str = "gpt-3.5-turbo", max_tokens: int = 2000):
-        self.model = model
+    def __init__(self, model: Optional[str] = None, max_tokens: int = 800):
+        self.model = model or settings.openai_model
         self.max_tokens = max_tokens
         self.api_key = settings.openai_api_key
         
         if not self.api_key:
             raise ValueError("OpenAI API key not configured")
         
-        openai.api_key = self.api_key
+        # Shared async HTTP client; a comparison issues a single call, so a small pool suffices
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+            timeout=httpx.Timeout(60.0)
+        )
+        self._client = AsyncOpenAI(api_key=self.api_key, http_client=self._http, max_retries=0)
+        self.cache = get_llm_cache() if settings.enable_llm_cache else None
+    
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._http.aclose()
     
     async def compare_analysis_runs(self, current_analysis: Dict[str, Any], 
                                   previous_analysis: Dict[str, Any]) -> ContentComparisonResult:
@@ -72,7 +157,8 @@ class ComparisonEngine:
                 changes_summary=basic_comparison["changes_summary"],
                 overall_change_assessment=ai_insights.get("overall_assessment"),
                 impact_analysis=ai_insights.get("impact_analysis"),
-                recommendations=ai_insights.get("recommendations", []),
+                recommendations=ai_insights.get("recommendations", ()),
+                ai_model=self.model,
                 processing_time=time.time() - start_time
             )
             
@@ -99,6 +185,7 @@ class ComparisonEngine:
                 overall_change_assessment=f"Comparison completed with errors: {str(e)}",
                 impact_analysis="Unable to generate AI insights due to technical error",
                 recommendations=["Fix technical issues and retry comparison"],
+                ai_model=self.model,
                 processing_time=time.time() - start_time
             )
     
@@ -110,57 +197,69 @@ class ComparisonEngine:
         current_pages = {page["page_url"]: page for page in current_results}
         previous_pages = {page["page_url"]: page for page in previous_results}
         
-        # Find new pages
-        new_pages = [url for url in current_pages.keys() if url not in previous_pages]
+        # Key views give O(1) membership; lists keep the crawl order of each run
+        current_urls = current_pages.keys()
+        previous_urls = previous_pages.keys()
+        new_pages = [url for url in current_urls if url not in previous_urls]
+        removed_pages = [url for url in previous_urls if url not in current_urls]
         
-        # Find removed pages
-        removed_pages = [url for url in previous_pages.keys() if url not in current_pages]
+        # Find modified pages among URLs present in both runs, collected column-wise
+        modified_table = ContentChangeTable()
+        for url in current_urls:
+            if url not in previous_urls:
+                continue
+            current_page = current_pages[url]
+            previous_page = previous_pages[url]
+            
+            # Check for changes
+            word_count_change = current_page.get("word_count", 0) - previous_page.get("word_count", 0)
+            
+            # Compare 64-bit fingerprints instead of the full HTML/text blobs
+            current_fp = self._page_fingerprints(current_page)
+            previous_fp = self._page_fingerprints(previous_page)
+            html_content_changed = current_fp["html_hash"] != previous_fp["html_hash"]
+            text_content_changed = current_fp["text_hash"] != previous_fp["text_hash"]
+            
+            # Check AI analysis changes
+            ai_analysis_changed = current_fp["ai_analysis_hash"] != previous_fp["ai_analysis_hash"]
+            
+            if (word_count_change != 0 or html_content_changed or text_content_changed):
+                modified_table.append(
+                    url,
+                    current_page.get("page_title") or "",
+                    ChangeType.MODIFIED,
+                    word_count_change=word_count_change,
+                    content_changed=html_content_changed or text_content_changed,
+                    ai_analysis_changed=ai_analysis_changed
+                )
         
-        # Find modified pages
-        modified_pages = []
-        for url in current_pages.keys():
-            if url in previous_pages:
-                current_page = current_pages[url]
-                previous_page = previous_pages[url]
-                
-                # Check for changes - compare actual HTML content
-                word_count_change = current_page.get("word_count", 0) - previous_page.get("word_count", 0)
-                
-                # Compare actual HTML content
-                current_html = current_page.get("html_content", "")
-                previous_html = previous_page.get("html_content", "")
-                html_content_changed = current_html != previous_html
-                
-                # Also check text content
-                current_text = current_page.get("text_content", "")
-                previous_text = previous_page.get("text_content", "")
-                text_content_changed = current_text != previous_text
-                
-                # Check AI analysis changes
-                ai_analysis_changed = current_page.get("ai_analysis") != previous_page.get("ai_analysis")
-                
-                if (word_count_change != 0 or html_content_changed or text_content_changed):
-                    modified_pages.append(ContentChange(
-                        url=url,
-                        title=current_page.get("page_title", ""),
-                        change_type="modified",
-                        word_count_change=word_count_change,
-                        content_changed=html_content_changed or text_content_changed,
-                        ai_analysis_changed=ai_analysis_changed
-                    ))
+        # Every field is computed here, so records are built without re-validation
+        modified_pages = modified_table.to_records()
         
         return {
             "new_pages": new_pages,
             "removed_pages": removed_pages,
             "modified_pages": modified_pages,
             "total_pages_compared": len(current_pages),
-            "changes_summary": {
-                "new_pages_count": len(new_pages),
-                "removed_pages_count": len(removed_pages),
-                "modified_pages_count": len(modified_pages)
-            }
+            "changes_summary": ChangesSummary(
+                new_pages_count=len(new_pages),
+                removed_pages_count=len(removed_pages),
+                modified_pages_count=modified_table.change_type_counts()[ChangeType.MODIFIED],
+                content_changed_count=modified_table.content_changed_count(),
+                ai_analysis_changed_count=modified_table.ai_analysis_changed_count()
+            )
         }
     
+    def _page_fingerprints(self, page: Dict[str, Any]) -> Dict[str, str]:
+        """Return the page's content fingerprints, computing and caching any that are missing"""
+        if "html_hash" not in page:
+            page["html_hash"] = content_fingerprint(page.get("html_content", ""))
+        if "text_hash" not in page:
+            page["text_hash"] = content_fingerprint(page.get("text_content", ""))
+        if "ai_analysis_hash" not in page:
+            page["ai_analysis_hash"] = json_fingerprint(page.get("ai_analysis"))
+        return page
+    
     async def _generate_ai_insights(self, current_results: List[Dict], 
                                   previous_results: List[Dict], 
                                   basic_comparison: Dict[str, Any]) -> Dict[str, Any]:
@@ -192,91 +291,75 @@ class ComparisonEngine:
         """Create a comprehensive comparison prompt for OpenAI"""
         
         # Prepare summary data
-        new_pages_count = basic_comparison["changes_summary"]["new_pages_count"]
-        removed_pages_count = basic_comparison["changes_summary"]["removed_pages_count"]
-        modified_pages_count = basic_comparison["changes_summary"]["modified_pages_count"]
+        changes_summary = basic_comparison["changes_summary"]
+        new_pages_count = changes_summary.new_pages_count
+        removed_pages_count = changes_summary.removed_pages_count
+        modified_pages_count = changes_summary.modified_pages_count
         
         # Sample some pages for detailed analysis - focus on content changes
-        sample_current = []
-        sample_previous = []
-        
-        # Get samples of modified pages to show content changes
-        for page in current_results[:5]:
-            sample_current.append({
-                "url": page.get("page_url", ""),
-                "title": page.get("page_title", ""),
-                "word_count": page.get("word_count", 0),
-                "content_preview": page.get("text_content", "")[:500] if page.get("text_content") else "",
-                "html_changed": "Yes" if page.get("html_content") else "No"
-            })
-        
-        for page in previous_results[:5]:
-            sample_previous.append({
-                "url": page.get("page_url", ""),
-                "title": page.get("page_title", ""),
-                "word_count": page.get("word_count", 0),
-                "content_preview": page.get("text_content", "")[:500] if page.get("text_content") else "",
-                "html_changed": "Yes" if page.get("html_content") else "No"
-            })
-        
-        prompt = f"""
-You are an expert web content strategist. Analyze the changes between two website analysis runs and provide strategic insights based on actual HTML content changes.
-
-CHANGE SUMMARY:
-- New Pages: {new_pages_count}
-- Removed Pages: {removed_pages_count}
-- Modified Pages: {modified_pages_count}
-- Total Pages Compared: {basic_comparison["total_pages_compared"]}
-
-SAMPLE CURRENT PAGES (showing actual content):
-{json.dumps(sample_current, indent=2)[:2000]}
-
-SAMPLE PREVIOUS PAGES (showing actual content):
-{json.dumps(sample_previous, indent=2)[:2000]}
-
-Please provide strategic insights in the following JSON format:
-
-{{
-    "overall_assessment": "Comprehensive assessment of the actual content changes and their impact on the website",
-    "impact_analysis": "Analysis of how these HTML content changes affect user experience, SEO, and business goals",
-    "recommendations": [
-        "Strategic recommendation 1 based on content changes",
-        "Strategic recommendation 2 based on content changes", 
-        "Strategic recommendation 3 based on content changes",
-        "Strategic recommendation 4 based on content changes",
-        "Strategic recommendation 5 based on content changes"
-    ]
-}}
-
-GUIDELINES:
-1. Focus on actual HTML content changes, not just structure or quality metrics
-2. Analyze the impact of content additions, removals, and modifications
-3. Consider SEO implications of content changes
-4. Assess user experience impact of content modifications
-5. Provide actionable recommendations based on content strategy
-6. Consider the overall website content health and growth trajectory
-7. Keep recommendations specific and implementable based on actual content changes
-"""
+        sample_current = [self._sample_page(page) for page in current_results[:5]]
+        sample_previous = [self._sample_page(page) for page in previous_results[:5]]
         
-        return prompt
+        # Samples are passed as tuples of items so the rendered prompt can be memoized
+        return _render_comparison_prompt(
+            new_pages_count,
+            removed_pages_count,
+            modified_pages_count,
+            basic_comparison["total_pages_compared"],
+            tuple(tuple(sample.items()) for sample in sample_current),
+            tuple(tuple(sample.items()) for sample in sample_previous)
+        )
+    
+    def _sample_page(self, page: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize a page for the comparison prompt without copying its full text or HTML"""
+        text_content = page.get("text_content") or ""
+        return {
+            "url": page.get("page_url", ""),
+            "title": page.get("page_title", ""),
+            "word_count": page.get("word_count", 0),
+            "content_preview": text_content[:500],
+            "html_changed": "Yes" if bool(page.get("html_content")) else "No"
+        }
     
     async def _call_openai_api(self, prompt: str) -> str:
         """Call OpenAI API with the comparison prompt"""
+        messages = (_SYSTEM_PROMPT_COMPARISON, {"role": "user", "content": prompt})
+        temperature = 0
+        
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(self.model, messages, self.max_tokens, temperature,
+                                             COMPARISON_RESPONSE_FORMAT)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are an expert web content strategist. Provide strategic insights about website changes and their impact on business goals, SEO, and user experience. Always respond with valid JSON."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=0.3
-            )
+            # Back off with jitter on rate limits and transient server/connection errors
+            async for attempt in AsyncRetrying(
+                wait=wait_random_exponential(min=1, max=30),
+                stop=stop_after_attempt(6),
+                retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+                reraise=True
+            ):
+                with attempt:
+                    stream = await self._client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=self.max_tokens,
+                        temperature=temperature,
+                        response_format=COMPARISON_RESPONSE_FORMAT,
+                        stream=True
+                    )
+                    # Stop reading once the outer object closes instead of waiting for trailing tokens
+                    content, complete = await collect_json_stream(stream)
             
-            return response.choices[0].message.content
+            # Never cache a reply cut off before the outer object closed
+            if not complete:
+                logger.warning("OpenAI response ended before the JSON object closed; not caching it")
+            elif self.cache:
+                await self.cache.set(cache_key, content, ttl=settings.llm_cache_ttl)
+            return content
             
         except Exception as e:
             logger.error(f"OpenAI API call failed: {e}")
@@ -285,14 +368,14 @@ GUIDELINES:
     def _parse_ai_insights_response(self, response: str) -> Dict[str, Any]:
         """Parse AI insights response"""
         try:
-            ai_data = json.loads(response)
+            ai_data = parse_llm_json(response)
             return {
                 "overall_assessment": ai_data.get("overall_assessment", "Assessment not available"),
                 "impact_analysis": ai_data.get("impact_analysis", "Impact analysis not available"),
                 "recommendations": ai_data.get("recommendations", [])
             }
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse AI insights response: {e}")
             return {
                 "overall_assessment": "AI response parsing failed",
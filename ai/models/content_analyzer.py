@@ -2,38 +2,301 @@
 AI-Powered Content Analysis Engine
 """
 
-import openai
-import json
+import httpx
+import orjson
+import tiktoken
 import logging
 import time
 import asyncio
+import bisect
 import os
 import sys
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from weakref import WeakValueDictionary
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, InternalServerError
+from tenacity import AsyncRetrying, retry_if_exception_type, wait_random_exponential, stop_after_attempt
 
 # Add project root to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from .llm_cache import get_llm_cache
+from .llm_json import collect_json_stream, parse_llm_json
 from .ai_models import AIAnalysisResult, ContentQualityScore, SEOAnalysis, UserExperienceAnalysis, TechnicalAnalysis
 from backend.utils.config import settings
+from backend.utils.hashing import content_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# System message shared by every call; only the user message is built per request
+_SYSTEM_PROMPT_ANALYZER = {
+    "role": "system",
+    "content": "You are an expert web content analyst. Provide detailed, actionable insights about webpage content quality, SEO, and user experience. Respond in JSON."
+}
+
+def _object_schema(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """Strict JSON schema object: every property required, nothing extra"""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False
+    }
+
+def _text(description: str) -> Dict[str, str]:
+    """String property with a description that guides the model"""
+    return {"type": "string", "description": description}
+
+def _text_list(description: str) -> Dict[str, Any]:
+    """Array-of-strings property with a description that guides the model"""
+    return {"type": "array", "items": {"type": "string"}, "description": description}
+
+# JSON schema for each analyzed page; enforced server-side through structured outputs
+ANALYSIS_JSON_SCHEMA = _object_schema({
+    "content_quality": _object_schema({
+        "score": {"type": "integer", "description": "Overall content quality score from 0 to 100"},
+        "assessment": _text("Brief assessment of overall content quality"),
+        "strengths": _text_list("Two to three content strengths"),
+        "weaknesses": _text_list("Two to three content weaknesses")
+    }),
+    "seo_analysis": _object_schema({
+        "title_quality": _text("Assessment of page title quality and SEO optimization"),
+        "content_relevance": _text("How well content matches the page purpose"),
+        "keyword_density": _text("Analysis of keyword usage and density"),
+        "recommendations": _text_list("Three SEO recommendations")
+    }),
+    "user_experience": _object_schema({
+        "readability": _text("Assessment of content readability and clarity"),
+        "structure": _text("Evaluation of page structure and organization"),
+        "navigation": _text("Assessment of navigation and user flow"),
+        "improvements": _text_list("Two to three UX improvements")
+    }),
+    "technical_analysis": _object_schema({
+        "html_structure": _text("Assessment of HTML structure and semantic markup"),
+        "accessibility": _text("Evaluation of accessibility features and compliance"),
+        "performance_impact": _text("Assessment of content's impact on page performance")
+    }),
+    "overall_recommendations": _text_list("Five overall recommendations")
+})
+
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "page_analysis", "strict": True, "schema": ANALYSIS_JSON_SCHEMA}
+}
+
+BATCH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "page_analysis_batch",
+        "strict": True,
+        "schema": _object_schema({"results": {"type": "array", "items": ANALYSIS_JSON_SCHEMA}})
+    }
+}
+
+ANALYSIS_GUIDELINES = """IMPORTANT GUIDELINES:
+1. Be specific and actionable in your recommendations
+2. Consider the page type and purpose in your analysis
+3. Focus on practical improvements that can be implemented
+4. Provide scores and assessments that are realistic and helpful
+5. Keep recommendations concise but informative"""
+
+def _escape_braces(text: str) -> str:
+    """Make literal text safe to embed in a str.format template"""
+    return text.replace("{", "{{").replace("}", "}}")
+
+# Prompt templates with the static guidelines baked in; only page data is filled per call.
+# The output shape comes from the response format schema, so no JSON example is sent.
+ANALYSIS_PROMPT_TEMPLATE = """
+You are an expert web content analyst. Analyze the following webpage and provide detailed, actionable insights.
+
+{page_section}
+
+""" + _escape_braces(ANALYSIS_GUIDELINES) + "\n"
+
+BATCH_PROMPT_TEMPLATE = """
+You are an expert web content analyst. Analyze each of the following {page_count} webpages and provide detailed, actionable insights.
+
+{pages_text}
+
+Return exactly {page_count} results, one per page in the order given above.
+
+""" + _escape_braces(ANALYSIS_GUIDELINES) + "\n"
+
+# Output caps: one page's JSON runs ~400 tokens, and a batch reply never needs more than the batch cap
+PAGE_MAX_OUTPUT_TOKENS = 800
+BATCH_MAX_OUTPUT_TOKENS = 4096
+
+# Page text sent per page, in model tokens (about the 3000 characters previously sent)
+CONTENT_TOKEN_BUDGET = 750
+
+# Hard ceiling on a whole page section; titles and URLs are not otherwise capped, so this
+# bounds every prompt at batch_size sections plus the fixed template
+PAGE_SECTION_TOKEN_LIMIT = 2000
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken encoding for a chat model, falling back to cl100k_base for models tiktoken does not know"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def _truncate_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Cut text to at most max_tokens model tokens"""
+    # A token is rarely longer than 8 characters, so only that much of the text needs encoding
+    head = text[:max_tokens * 8]
+    encoding = _encoding(model)
+    tokens = encoding.encode(head, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return head
+    return encoding.decode(tokens[:max_tokens])
+
+# Upper bounds (estimated prompt tokens) of the size bins pages are batched within
+PROMPT_SIZE_BINS = (150, 400)
+
+# Sub-results shared by every failed/unparseable analysis; never mutated. Built on first use so
+# importing this module doesn't force the deferred AI model schemas to compile.
+_RETRY_ADVICE = ("Fix technical issues and retry analysis",)
+_PARSE_RETRY_ADVICE = ("Retry analysis or check AI response format",)
+
+@lru_cache(maxsize=None)
+def _failed_sections() -> MappingProxyType:
+    """Shared SEO/UX/technical sections for an analysis that failed outright"""
+    return MappingProxyType({
+        "seo_analysis": SEOAnalysis(
+            title_quality="Analysis failed",
+            content_relevance="Analysis failed",
+            keyword_density="Analysis failed",
+            recommendations=_RETRY_ADVICE
+        ),
+        "user_experience": UserExperienceAnalysis(
+            readability="Analysis failed",
+            structure="Analysis failed",
+            navigation="Analysis failed",
+            improvements=_RETRY_ADVICE
+        ),
+        "technical_analysis": TechnicalAnalysis(
+            html_structure="Analysis failed",
+            accessibility="Analysis failed",
+            performance_impact="Analysis failed"
+        )
+    })
+
+@lru_cache(maxsize=None)
+def _parse_failed_sections() -> MappingProxyType:
+    """Shared sections for an analysis whose AI response could not be parsed"""
+    return MappingProxyType({
+        "content_quality": ContentQualityScore(
+            score=50,
+            assessment="AI response parsing failed",
+            weaknesses=("Unable to parse AI analysis",)
+        ),
+        "seo_analysis": SEOAnalysis(
+            title_quality="Analysis parsing failed",
+            content_relevance="Analysis parsing failed",
+            keyword_density="Analysis parsing failed",
+            recommendations=_PARSE_RETRY_ADVICE
+        ),
+        "user_experience": UserExperienceAnalysis(
+            readability="Analysis parsing failed",
+            structure="Analysis parsing failed",
+            navigation="Analysis parsing failed",
+            improvements=_PARSE_RETRY_ADVICE
+        ),
+        "technical_analysis": TechnicalAnalysis(
+            html_structure="Analysis parsing failed",
+            accessibility="Analysis parsing failed",
+            performance_impact="Analysis parsing failed"
+        )
+    })
+
+def _summarize_structure(structure: Any, budget: int = 1000) -> str:
+    """Summarize an extracted html_structure (element counts, heading outline) in at most budget chars"""
+    if not isinstance(structure, dict):
+        return str(structure)[:budget]
+    
+    parts = []
+    elements = structure.get("structure_elements")
+    if isinstance(elements, dict) and elements:
+        counts = ", ".join(f"{name}={len(items)}" for name, items in elements.items() if isinstance(items, list))
+        parts.append(f"Elements: {counts}")
+        headings = [h for h in elements.get("headings") or [] if isinstance(h, dict)]
+        levels = Counter(h.get("tag", "") for h in headings)
+        if levels:
+            parts.append("Heading levels: " + ", ".join(f"{tag}={n}" for tag, n in levels.most_common(6)))
+            parts.append("Outline:")
+            parts.extend(f"  {h.get('tag', '')}: {h.get('text', '')[:80]}" for h in islice(headings, 10))
+    
+    # Remaining keys are described by type and size only; the cleaned HTML itself is never copied
+    for key, value in islice(((k, v) for k, v in structure.items() if k != "structure_elements"), 20):
+        if isinstance(value, (list, dict)):
+            parts.append(f"{key}: {type(value).__name__} of {len(value)}")
+        elif isinstance(value, str) and len(value) > 80:
+            parts.append(f"{key}: {len(value)} chars")
+        else:
+            parts.append(f"{key}: {value}")
+    
+    return "\n".join(parts)[:budget]
+
+@lru_cache(maxsize=1024)
+def _render_page_section(url: str, title: str, word_count: int, page_type: str,
+                         content_preview: str, structure_preview: str) -> str:
+    """Render a page's prompt section; memoized on the truncated inputs so retries and re-runs reuse it"""
+    return f"""WEBPAGE INFORMATION:
+- URL: {url}
+- Title: {title}
+- Word Count: {word_count}
+- Page Type: {page_type}
+
+CONTENT:
+{content_preview}
+
+HTML STRUCTURE:
+{structure_preview}"""
+
 class ContentAnalyzer:
     """AI-powered content analysis using OpenAI API"""
     
-    def __init__(self, model: str = "gpt-3.5-turbo", max_tokens: int = 1500):
-        self.model = model
+    def __init__(self, model: Optional[str] = None, max_tokens: int = PAGE_MAX_OUTPUT_TOKENS, max_concurrency: int = 16,
+                 batch_size: int = 4):
+        self.model = model or settings.openai_model
         self.max_tokens = max_tokens
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
         self.api_key = settings.openai_api_key
         
         if not self.api_key:
             raise ValueError("OpenAI API key not configured")
         
-        openai.api_key = self.api_key
+        # Pool is sized to the concurrency limit so keep-alive connections are reused across pages
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_concurrency * 2,
+                max_keepalive_connections=max_concurrency
+            ),
+            timeout=httpx.Timeout(60.0)
+        )
+        self._client = AsyncOpenAI(api_key=self.api_key, http_client=self._http, max_retries=0)
+        self.cache = get_llm_cache() if settings.enable_llm_cache else None
+        # Identical frozen sub-analyses (common across templated pages) share one instance
+        self._leaf_pool: WeakValueDictionary = WeakValueDictionary()
+    
+    async def warmup(self):
+        """Prime the connection pool with a cheap request before the first analysis"""
+        try:
+            await self._client.models.list()
+        except Exception as e:
+            logger.warning(f"OpenAI warm-up request failed: {e}")
+    
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._http.aclose()
     
     async def analyze_page_content(self, page_data: Dict[str, Any]) -> AIAnalysisResult:
         """
@@ -90,28 +353,12 @@ class ContentAnalyzer:
                 content_quality=ContentQualityScore(
                     score=0,
                     assessment=f"Analysis failed: {str(e)}",
-                    strengths=[],
-                    weaknesses=["Analysis failed due to technical error"]
-                ),
-                seo_analysis=SEOAnalysis(
-                    title_quality="Analysis failed",
-                    content_relevance="Analysis failed",
-                    keyword_density="Analysis failed",
-                    recommendations=["Fix technical issues and retry analysis"]
-                ),
-                user_experience=UserExperienceAnalysis(
-                    readability="Analysis failed",
-                    structure="Analysis failed",
-                    navigation="Analysis failed",
-                    improvements=["Fix technical issues and retry analysis"]
-                ),
-                technical_analysis=TechnicalAnalysis(
-                    html_structure="Analysis failed",
-                    accessibility="Analysis failed",
-                    performance_impact="Analysis failed"
+                    weaknesses=("Analysis failed due to technical error",)
                 ),
-                overall_recommendations=["Fix technical issues and retry analysis"],
+                **_failed_sections(),
+                overall_recommendations=_RETRY_ADVICE,
                 raw_ai_response=f"Error: {str(e)}",
+                ai_model=self.model,
                 processing_time=time.time() - start_time
             )
     
@@ -125,105 +372,178 @@ class ContentAnalyzer:
         Returns:
             List[AIAnalysisResult]: List of analysis results
         """
-        results = []
+        # Templated/duplicate pages share one analysis: only one page per content signature is sent
+        representatives: Dict[str, Dict[str, Any]] = {}
+        signatures = []
+        for page in pages_data:
+            sig = content_fingerprint(f"{page.get('text_content') or ''}|{page.get('page_type', '')}")
+            signatures.append(sig)
+            representatives.setdefault(sig, page)
+        unique_pages = list(representatives.values())
+        if len(unique_pages) < len(pages_data):
+            logger.info(f"Skipping {len(pages_data) - len(unique_pages)} duplicate pages ({len(unique_pages)} unique)")
         
-        for i, page_data in enumerate(pages_data):
-            try:
-                logger.info(f"Analyzing page {i+1}/{len(pages_data)}: {page_data.get('page_url', 'Unknown')}")
-                result = await self.analyze_page_content(page_data)
-                results.append(result)
-                
-                # Add small delay to avoid rate limiting
-                if i < len(pages_data) - 1:
-                    import asyncio
-                    await asyncio.sleep(0.5)
-                    
-            except Exception as e:
-                logger.error(f"Failed to analyze page {page_data.get('page_url', 'unknown')}: {e}")
+        # Pages are sent to OpenAI in batches of similar prompt size, so a short page never
+        # waits on a long one; in-flight calls are bounded by the semaphore
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        bins: Dict[int, List[Dict[str, Any]]] = {}
+        for page in unique_pages:
+            bins.setdefault(self._size_bin(page), []).append(page)
+        batches = [
+            binned[i:i + self.batch_size]
+            for _, binned in sorted(bins.items())
+            for i in range(0, len(binned), self.batch_size)
+        ]
+        
+        async def _analyze_one(index: int, batch: List[Dict[str, Any]]) -> List[AIAnalysisResult]:
+            async with semaphore:
+                logger.info(f"Analyzing batch {index+1}/{len(batches)} ({len(batch)} pages)")
+                return await self._analyze_batch(batch)
+        
+        outcomes = await asyncio.gather(
+            *[_analyze_one(i, batch) for i, batch in enumerate(batches)],
+            return_exceptions=True
+        )
+        
+        analyzed: Dict[int, AIAnalysisResult] = {}
+        for batch, outcome in zip(batches, outcomes):
+            if isinstance(outcome, Exception):
+                urls = ", ".join(page.get("page_url", "unknown") for page in batch)
+                logger.error(f"Failed to analyze pages {urls}: {outcome}")
                 continue
+            for page, result in zip(batch, outcome):
+                analyzed[id(page)] = result
+        
+        # Keep input order, dropping pages whose batch failed outright
+        results = []
+        for page, sig in zip(pages_data, signatures):
+            representative = representatives[sig]
+            result = analyzed.get(id(representative))
+            if result is None:
+                continue
+            if page is not representative:
+                result = result.model_copy(update={
+                    "page_url": page.get("page_url", "Unknown"),
+                    "page_title": page.get("page_title", "No title")
+                })
+            results.append(result)
         
         return results
     
-    def _create_analysis_prompt(self, url: str, title: str, word_count: int, 
-                              page_type: str, content: str, html_structure: Dict) -> str:
-        """Create a comprehensive analysis prompt for OpenAI"""
+    async def _analyze_batch(self, batch: List[Dict[str, Any]]) -> List[AIAnalysisResult]:
+        """Analyze a group of pages with a single API call, falling back to per-page calls"""
+        if len(batch) == 1:
+            return [await self.analyze_page_content(batch[0])]
         
-        # Limit content to avoid token limits
-        content_preview = content[:3000] if content else "No content available"
-        structure_preview = str(html_structure)[:1000] if html_structure else "No structure data"
+        start_time = time.time()
         
-        prompt = f"""
-You are an expert web content analyst. Analyze the following webpage and provide detailed, actionable insights.
-
-WEBPAGE INFORMATION:
-- URL: {url}
-- Title: {title}
-- Word Count: {word_count}
-- Page Type: {page_type}
-
-CONTENT:
-{content_preview}
-
-HTML STRUCTURE:
-{structure_preview}
-
-Please provide a comprehensive analysis in the following JSON format:
-
-{{
-    "content_quality": {{
-        "score": 85,
-        "assessment": "Brief assessment of overall content quality",
-        "strengths": ["strength1", "strength2", "strength3"],
-        "weaknesses": ["weakness1", "weakness2"]
-    }},
-    "seo_analysis": {{
-        "title_quality": "Assessment of page title quality and SEO optimization",
-        "content_relevance": "How well content matches the page purpose",
-        "keyword_density": "Analysis of keyword usage and density",
-        "recommendations": ["seo_rec1", "seo_rec2", "seo_rec3"]
-    }},
-    "user_experience": {{
-        "readability": "Assessment of content readability and clarity",
-        "structure": "Evaluation of page structure and organization",
-        "navigation": "Assessment of navigation and user flow",
-        "improvements": ["ux_improvement1", "ux_improvement2"]
-    }},
-    "technical_analysis": {{
-        "html_structure": "Assessment of HTML structure and semantic markup",
-        "accessibility": "Evaluation of accessibility features and compliance",
-        "performance_impact": "Assessment of content's impact on page performance"
-    }},
-    "overall_recommendations": ["rec1", "rec2", "rec3", "rec4", "rec5"]
-}}
-
-IMPORTANT GUIDELINES:
-1. Be specific and actionable in your recommendations
-2. Consider the page type and purpose in your analysis
-3. Focus on practical improvements that can be implemented
-4. Provide scores and assessments that are realistic and helpful
-5. Ensure all JSON is properly formatted and valid
-6. Keep recommendations concise but informative
-"""
+        try:
+            prompt = self._create_batch_prompt(batch)
+            response = await self._call_openai_api(prompt, max_tokens=min(self.max_tokens * len(batch), BATCH_MAX_OUTPUT_TOKENS),
+                                                 response_format=BATCH_RESPONSE_FORMAT)
+            
+            items = parse_llm_json(response).get("results", [])
+            if len(items) != len(batch):
+                raise ValueError(f"expected {len(batch)} results, got {len(items)}")
+            
+            processing_time = (time.time() - start_time) / len(batch)
+            results = []
+            for page_data, ai_data in zip(batch, items):
+                result = self._build_analysis_result(
+                    ai_data,
+                    page_data.get("page_url", "Unknown"),
+                    page_data.get("page_title", "No title"),
+                    page_data.get("word_count", 0),
+                    page_data.get("page_type", "unknown"),
+                    orjson.dumps(ai_data).decode()
+                )
+                result.processing_time = processing_time
+                results.append(result)
+            
+            logger.info(f"Successfully analyzed batch of {len(batch)} pages in {time.time() - start_time:.2f}s")
+            return results
+            
+        except Exception as e:
+            logger.warning(f"Batch analysis failed ({e}), falling back to per-page analysis")
+            return [await self.analyze_page_content(page_data) for page_data in batch]
+    
+    @staticmethod
+    def _size_bin(page: Dict[str, Any]) -> int:
+        """Bucket a page by its estimated prompt tokens (~4 chars per token of the truncated content)"""
+        estimated_tokens = min(len(page.get("text_content") or ""), 3000) // 4
+        return bisect.bisect_right(PROMPT_SIZE_BINS, estimated_tokens)
+    
+    def _format_page_section(self, url: str, title: str, word_count: int, 
+                             page_type: str, content: str, html_structure: Dict) -> str:
+        """Format a page's metadata, content and structure for a prompt"""
+        
+        # Limit content by model tokens; markup-heavy text no longer overshoots a character cap
+        content_preview = _truncate_tokens(content, CONTENT_TOKEN_BUDGET, self.model) if content else "No content available"
+        structure_preview = _summarize_structure(html_structure) if html_structure else "No structure data"
         
-        return prompt
+        page_section = _render_page_section(url, title, word_count, page_type, content_preview, structure_preview)
+        return _truncate_tokens(page_section, PAGE_SECTION_TOKEN_LIMIT, self.model)
+    
+    def _create_batch_prompt(self, pages: List[Dict]) -> str:
+        """Create a single prompt that asks for an analysis of every page in the batch"""
+        sections = []
+        for i, page in enumerate(pages):
+            section = self._format_page_section(
+                page.get("page_url", "Unknown"), page.get("page_title", "No title"),
+                page.get("word_count", 0), page.get("page_type", "unknown"),
+                page.get("text_content", ""), page.get("html_structure", {})
+            )
+            sections.append(f"=== PAGE {i+1} ===\n{section}")
+        pages_text = "\n\n".join(sections)
+        
+        return BATCH_PROMPT_TEMPLATE.format_map({"page_count": len(pages), "pages_text": pages_text})
+    
+    def _create_analysis_prompt(self, url: str, title: str, word_count: int, 
+                              page_type: str, content: str, html_structure: Dict) -> str:
+        """Create a comprehensive analysis prompt for OpenAI"""
+        page_section = self._format_page_section(url, title, word_count, page_type, content, html_structure)
+        return ANALYSIS_PROMPT_TEMPLATE.format_map({"page_section": page_section})
     
-    async def _call_openai_api(self, prompt: str) -> str:
+    async def _call_openai_api(self, prompt: str, max_tokens: Optional[int] = None,
+                               response_format: Dict[str, Any] = ANALYSIS_RESPONSE_FORMAT) -> str:
         """Call OpenAI API with the analysis prompt"""
+        max_tokens = max_tokens or self.max_tokens
+        messages = (_SYSTEM_PROMPT_ANALYZER, {"role": "user", "content": prompt})
+        temperature = 0
+        
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(self.model, messages, max_tokens, temperature, response_format)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are an expert web content analyst. Provide detailed, actionable insights about webpage content quality, SEO, and user experience. Always respond with valid JSON."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=0.3
-            )
+            # Back off with jitter on rate limits and transient server/connection errors
+            async for attempt in AsyncRetrying(
+                wait=wait_random_exponential(min=1, max=30),
+                stop=stop_after_attempt(6),
+                retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+                reraise=True
+            ):
+                with attempt:
+                    stream = await self._client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        response_format=response_format,
+                        stream=True
+                    )
+                    # Stop reading once the outer object closes instead of waiting for trailing tokens
+                    content, complete = await collect_json_stream(stream)
             
-            return response.choices[0].message.content
+            # Never cache a reply cut off before the outer object closed
+            if not complete:
+                logger.warning("OpenAI response ended before the JSON object closed; not caching it")
+            elif self.cache:
+                await self.cache.set(cache_key, content, ttl=settings.llm_cache_ttl)
+            return content
             
         except Exception as e:
             logger.error(f"OpenAI API call failed: {e}")
@@ -234,29 +554,10 @@ IMPORTANT GUIDELINES:
         """Parse AI response and create structured result"""
         try:
             # Try to parse JSON response
-            ai_data = json.loads(response)
-            
-            # Extract analysis components
-            content_quality = ContentQualityScore(**ai_data.get("content_quality", {}))
-            seo_analysis = SEOAnalysis(**ai_data.get("seo_analysis", {}))
-            user_experience = UserExperienceAnalysis(**ai_data.get("user_experience", {}))
-            technical_analysis = TechnicalAnalysis(**ai_data.get("technical_analysis", {}))
-            overall_recommendations = ai_data.get("overall_recommendations", [])
-            
-            return AIAnalysisResult(
-                page_url=url,
-                page_title=title,
-                word_count=word_count,
-                page_type=page_type,
-                content_quality=content_quality,
-                seo_analysis=seo_analysis,
-                user_experience=user_experience,
-                technical_analysis=technical_analysis,
-                overall_recommendations=overall_recommendations,
-                raw_ai_response=response
-            )
+            ai_data = parse_llm_json(response)
+            return self._build_analysis_result(ai_data, url, title, word_count, page_type, response)
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse AI response as JSON: {e}")
             logger.error(f"Raw response: {response}")
             
@@ -266,33 +567,40 @@ IMPORTANT GUIDELINES:
                 page_title=title,
                 word_count=word_count,
                 page_type=page_type,
-                content_quality=ContentQualityScore(
-                    score=50,
-                    assessment="AI response parsing failed",
-                    strengths=[],
-                    weaknesses=["Unable to parse AI analysis"]
-                ),
-                seo_analysis=SEOAnalysis(
-                    title_quality="Analysis parsing failed",
-                    content_relevance="Analysis parsing failed",
-                    keyword_density="Analysis parsing failed",
-                    recommendations=["Retry analysis or check AI response format"]
-                ),
-                user_experience=UserExperienceAnalysis(
-                    readability="Analysis parsing failed",
-                    structure="Analysis parsing failed",
-                    navigation="Analysis parsing failed",
-                    improvements=["Retry analysis or check AI response format"]
-                ),
-                technical_analysis=TechnicalAnalysis(
-                    html_structure="Analysis parsing failed",
-                    accessibility="Analysis parsing failed",
-                    performance_impact="Analysis parsing failed"
-                ),
-                overall_recommendations=["Retry analysis or check AI response format"],
-                raw_ai_response=response
+                **_parse_failed_sections(),
+                overall_recommendations=_PARSE_RETRY_ADVICE,
+                raw_ai_response=response,
+                ai_model=self.model
             )
         
         except Exception as e:
             logger.error(f"Error parsing AI response: {e}")
             raise
+    
+    def _build_analysis_result(self, ai_data: Dict[str, Any], url: str, title: str,
+                               word_count: int, page_type: str, response: str) -> AIAnalysisResult:
+        """Create a structured result from one page's parsed AI analysis"""
+        content_quality = self._intern_leaf(ContentQualityScore(**ai_data.get("content_quality", {})))
+        seo_analysis = self._intern_leaf(SEOAnalysis(**ai_data.get("seo_analysis", {})))
+        user_experience = self._intern_leaf(UserExperienceAnalysis(**ai_data.get("user_experience", {})))
+        technical_analysis = self._intern_leaf(TechnicalAnalysis(**ai_data.get("technical_analysis", {})))
+        overall_recommendations = ai_data.get("overall_recommendations", ())
+        
+        return AIAnalysisResult(
+            page_url=url,
+            page_title=title,
+            word_count=word_count,
+            page_type=page_type,
+            content_quality=content_quality,
+            seo_analysis=seo_analysis,
+            user_experience=user_experience,
+            technical_analysis=technical_analysis,
+            overall_recommendations=overall_recommendations,
+            raw_ai_response=response,
+            ai_model=self.model
+        )
+    
+    def _intern_leaf(self, leaf):
+        """Return the pooled instance equal to this frozen sub-analysis, pooling it if new"""
+        key = (type(leaf), *leaf.__dict__.values())
+        return self._leaf_pool.setdefault(key, leaf)
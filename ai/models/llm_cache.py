@@ -0,0 +1,118 @@
+"""
+Exact-match response cache for OpenAI calls
+"""
+
+import asyncio
+import hashlib
+import logging
+import orjson
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from backend.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Expired SQLite rows are swept at most this often, from set()
+PURGE_INTERVAL_SECONDS = 3600
+
+class LLMCache:
+    """SHA256-keyed cache of raw LLM responses, backed by SQLite (default) or Redis"""
+
+    def __init__(self, path: str = "llm_cache.sqlite3", redis_url: Optional[str] = None):
+        self.hits = 0
+        self.misses = 0
+        self._redis = None
+        self._conn = None
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+        if redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(redis_url)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires_at ON llm_cache (expires_at)")
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: Sequence[Dict[str, Any]], max_tokens: int, temperature: float,
+                 response_format: Optional[Dict[str, Any]] = None) -> str:
+        """Build the cache key from everything that influences the response"""
+        payload = orjson.dumps({
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "response_format": response_format
+        }, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss; the lookup runs in a worker thread"""
+        return await asyncio.to_thread(self._get, key)
+    
+    async def set(self, key: str, value: str, ttl: int):
+        """Store a response for ttl seconds; the write runs in a worker thread"""
+        await asyncio.to_thread(self._set, key, value, ttl)
+    
+    def _get(self, key: str) -> Optional[str]:
+        """Blocking cache lookup"""
+        value = None
+        try:
+            if self._redis is not None:
+                cached = self._redis.get(f"llm_cache:{key}")
+                value = cached.decode("utf-8") if cached is not None else None
+            else:
+                with self._lock:
+                    row = self._conn.execute(
+                        "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                if row and row[1] > time.time():
+                    value = row[0]
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        logger.debug("LLM cache %s (hits=%d, misses=%d)", "hit" if value is not None else "miss", self.hits, self.misses)
+        return value
+
+    def _set(self, key: str, value: str, ttl: int):
+        """Blocking cache write; also sweeps expired SQLite rows every PURGE_INTERVAL_SECONDS"""
+        try:
+            if self._redis is not None:
+                self._redis.set(f"llm_cache:{key}", value, ex=ttl)
+            else:
+                now = time.time()
+                with self._lock:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, value, now + ttl)
+                    )
+                    if now - self._last_purge >= PURGE_INTERVAL_SECONDS:
+                        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+                        self._last_purge = now
+                    self._conn.commit()
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {e}")
+
+_llm_cache: Optional[LLMCache] = None
+
+def get_llm_cache() -> LLMCache:
+    """Get the process-wide LLM cache instance"""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMCache(
+            path=settings.llm_cache_path,
+            redis_url=settings.llm_cache_redis_url or None
+        )
+    return _llm_cache
@@ -0,0 +1,73 @@
+"""
+Tolerant JSON decoding for LLM responses
+"""
+
+import re
+import orjson
+from typing import Any, Tuple
+
+# Outermost {...} span, for replies wrapped in markdown fences or surrounded by prose
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+def parse_llm_json(response: str) -> Any:
+    """Decode an LLM reply as JSON, salvaging an embedded object (raises orjson.JSONDecodeError if none)"""
+    try:
+        return orjson.loads(response)
+    except orjson.JSONDecodeError:
+        match = _JSON_OBJECT_RE.search(response or "")
+        if match is None:
+            raise
+        return orjson.loads(match.group(0))
+
+class JSONObjectTracker:
+    """Incrementally track brace depth of a streamed JSON object, ignoring braces inside strings"""
+
+    __slots__ = ("depth", "started", "in_string", "escaped")
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> int:
+        """Consume a chunk; return the index just past the outer closing brace, or -1 if still open"""
+        for i, ch in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+                self.started = True
+            elif ch == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+async def collect_json_stream(stream) -> Tuple[str, bool]:
+    """Accumulate a streamed chat completion, closing the stream once the outer JSON object is complete.
+    Returns the text and whether the outer object actually closed (False on a max_tokens cutoff)."""
+    tracker = JSONObjectTracker()
+    parts = []
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            end = tracker.feed(delta)
+            if end >= 0:
+                parts.append(delta[:end])
+                break
+            parts.append(delta)
+    finally:
+        await stream.close()
+    return "".join(parts), tracker.started and tracker.depth == 0
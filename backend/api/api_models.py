@@ -15,6 +15,7 @@ class AnalysisStatus(str, Enum):
     PENDING = "pending"
     RUNNING = "running"
     COMPLETED = "completed"
+    COMPLETED_EMPTY = "completed-empty"
     FAILED = "failed"
 
 class ScheduleFrequency(str, Enum):
@@ -57,6 +58,9 @@ class ApplicationBase(BaseModel):
     extract_resource_links: bool = Field(default=False, description="Extract resource links (images, CSS, JS files)")
     extract_external_links: bool = Field(default=False, description="Extract links to external domains")
     
+    # Link storage configuration
+    persist_valid_links: bool = Field(default=False, description="Also store links that validated successfully (broken links are always stored)")
+    
     @field_validator('max_links_to_validate')
     @classmethod
     def validate_links_to_pages_ratio(cls, v, info):
@@ -81,6 +85,7 @@ class ApplicationUpdate(BaseModel):
     max_links_to_validate: Optional[int] = Field(None, ge=10, le=2000)
     enable_ai_evaluation: Optional[bool] = None
     max_ai_evaluation_pages: Optional[int] = Field(None, ge=1, le=50)
+    persist_valid_links: Optional[bool] = None
 
 class Application(ApplicationBase):
     id: str
@@ -258,3 +263,48 @@ class ParentChildRelationships(BaseModel):
     parent_map: Dict[str, Optional[str]] = {}  # child_url -> parent_url (None for root)
     children_map: Dict[str, List[str]] = {}  # parent_url -> [child_urls]
     path_map: Dict[str, List[str]] = {}  # url -> [path_to_root]
+
+class ParentChildRelationshipsCSR(BaseModel):
+    """Columnar (CSR) form of the crawl graph as stored in MongoDB"""
+    urls: List[str] = []  # unique node URLs
+    child_offsets: List[int] = [0]  # children of urls[i] are child_indices[child_offsets[i]:child_offsets[i + 1]]
+    child_indices: List[int] = []  # indices into urls
+    parent_index: List[int] = []  # index of urls[i]'s parent, -1 for the root or unknown
+    
+    @classmethod
+    def from_maps(cls, parent_map: Dict[str, Optional[str]], children_map: Dict[str, Any]) -> "ParentChildRelationshipsCSR":
+        """Build the columnar form from parent/children dicts in one pass each"""
+        index: Dict[str, int] = {}
+        for child_url, parent_url in parent_map.items():
+            index.setdefault(child_url, len(index))
+            if parent_url is not None:
+                index.setdefault(parent_url, len(index))
+        for parent_url, child_urls in children_map.items():
+            index.setdefault(parent_url, len(index))
+            for child_url in child_urls:
+                index.setdefault(child_url, len(index))
+        
+        urls = list(index)
+        child_offsets = [0]
+        child_indices: List[int] = []
+        for url in urls:
+            child_indices.extend(index[child_url] for child_url in children_map.get(url, ()))
+            child_offsets.append(len(child_indices))
+        parent_index = [
+            index[parent_map[url]] if parent_map.get(url) is not None else -1
+            for url in urls
+        ]
+        return cls.model_construct(urls=urls, child_offsets=child_offsets,
+                                   child_indices=child_indices, parent_index=parent_index)
+    
+    def to_maps(self):
+        """Project back to (parent_map, children_map) dicts; roots and leaves are omitted"""
+        urls = self.urls
+        parent_map = {url: urls[parent] for url, parent in zip(urls, self.parent_index) if parent >= 0}
+        offsets = self.child_offsets
+        children_map = {
+            url: {urls[child] for child in self.child_indices[offsets[i]:offsets[i + 1]]}
+            for i, url in enumerate(urls)
+            if offsets[i + 1] > offsets[i]
+        }
+        return parent_map, children_map
@@ -2,16 +2,25 @@
 FastAPI application for website analysis platform
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, Request, status, BackgroundTasks
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 import jwt
 import bcrypt
+import hashlib
+import hmac
+from cachetools import TTLCache
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Optional
 import logging
+import os
+import time
 from bson import ObjectId
 from urllib.parse import unquote
 
@@ -22,7 +31,8 @@ from .api_models import (
     SourceCodeResponse, HighlightedLink, ParentChildRelationships, AnalysisStatus
 )
 from ..database.database_schema import get_database, DatabaseManager
-from ..tasks.celery_tasks import run_website_analysis
+from ..tasks.celery_app import celery_app
+from ..tasks.celery_tasks import run_website_analysis, run_content_analysis as run_content_analysis_task
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,7 +42,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Website Analysis Platform",
     description="A comprehensive platform for website analysis with automated scheduling",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -44,6 +55,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Log unexpected errors once and return a generic 500"""
+    logger.error("Unhandled error on %s %s", request.method, request.url.path, exc_info=exc)
+    return ORJSONResponse({"detail": "Internal server error"}, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -51,16 +68,74 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 security = HTTPBearer()
 SECRET_KEY = "your-secret-key-here"  # Use environment variable in production
 ALGORITHM = "HS256"
+# Encoded once so PyJWT doesn't re-encode the HMAC key on every sign/verify
+_SECRET_KEY_BYTES = SECRET_KEY.encode('utf-8')
 
 # ObjectId conversion is now handled in the database layer
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+_ACCESS_TOKEN_EXPIRES = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+# Bound once; handlers call it without the module-global + attribute lookup
+_utcnow = datetime.utcnow
+
+# Resolved users keyed by raw token; each entry also carries its own deadline, capped by the token's exp.
+# Revocation is checked against Mongo on every request, so a logout applies to all workers at once.
+USER_CACHE_TTL_SECONDS = 60
+_token_cache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL_SECONDS)
+
+# Argon2id for new hashes (OWASP minimum profile); one shared hasher since parameter setup is not free
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+# argon2 and bcrypt both release the GIL while hashing, so a thread pool keeps the event loop free without pickling overhead
+_pw_pool = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="password-hash")
+
+def _hash_password(password: str) -> str:
+    """Hash a password with Argon2id, returning the PHC-encoded string"""
+    return _password_hasher.hash(password)
+
+def _verify_password(password: str, password_hash: str) -> bool:
+    """Check a password against its stored hash; legacy bcrypt hashes are still accepted"""
+    if password_hash.startswith("$2"):
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    try:
+        return _password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def _password_needs_rehash(password_hash: str) -> bool:
+    """True for legacy bcrypt hashes and Argon2 hashes made with outdated parameters"""
+    return password_hash.startswith("$2") or _password_hasher.check_needs_rehash(password_hash)
+
+@app.on_event("shutdown")
+async def shutdown_password_pool():
+    """Release the password hashing workers"""
+    _pw_pool.shutdown(wait=False)
+
+def _eq(a: str, b: str) -> bool:
+    """Constant-time string comparison for ownership checks"""
+    return hmac.compare_digest(str(a).encode('utf-8'), b.encode('utf-8'))
+
+def _token_id(token: str) -> str:
+    """Stable identifier for a bearer token in the revocation list (covers tokens issued without a jti)"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
 
 # Dependency to get current user
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: DatabaseManager = Depends(get_database)
+):
     """Get current authenticated user"""
+    token = credentials.credentials
+    cached = _token_cache.get(token)
+    if cached is not None:
+        user, cached_until = cached
+        if time.time() < cached_until:
+            # Hand out a copy so a handler mutating current_user can't leak into later requests
+            return dict(user)
+        _token_cache.pop(token, None)
+    
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(
@@ -75,7 +150,13 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    db = await get_database()
+    if await db.is_token_revoked(_token_id(token)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     user = await db.get_user_by_email(email)
     if user is None:
         raise HTTPException(
@@ -83,8 +164,54 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    now = time.time()
+    _token_cache[token] = (dict(user), min(now + USER_CACHE_TTL_SECONDS, payload.get("exp", now)))
     return user
 
+async def get_owned_application(
+    app_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: DatabaseManager = Depends(get_database)
+) -> dict:
+    """Get an application, checking that it belongs to the current user"""
+    application = await db.get_application_by_id(app_id)
+    if not application:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Application not found"
+        )
+    
+    if not _eq(application["user_id"], current_user["id_str"]):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return application
+
+async def get_owned_run(
+    run_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: DatabaseManager = Depends(get_database)
+) -> dict:
+    """Get an analysis run, checking that its application belongs to the current user"""
+    run = await db.get_analysis_run_by_id(run_id)
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis run not found"
+        )
+    
+    application = await db.get_application_by_id(run["application_id"])
+    if not application or not _eq(application["user_id"], current_user["id_str"]):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return run
+
 # Authentication endpoints
 @app.post("/auth/register", response_model=dict)
 async def register(user_data: UserCreate):
@@ -99,16 +226,18 @@ async def register(user_data: UserCreate):
             detail="Email already registered"
         )
     
-    # Hash password
-    hashed_password = bcrypt.hashpw(user_data.password.encode('utf-8'), bcrypt.gensalt())
+    # Hash password off the event loop
+    hashed_password = await asyncio.get_running_loop().run_in_executor(
+        _pw_pool, _hash_password, user_data.password
+    )
     
     # Create user
     user_dict = {
         "email": user_data.email,
         "name": user_data.name,
         "role": user_data.role.value,
-        "password_hash": hashed_password.decode('utf-8'),
-        "created_at": datetime.utcnow(),
+        "password_hash": hashed_password,
+        "created_at": _utcnow(),
         "is_active": True
     }
     
@@ -137,18 +266,27 @@ async def login(login_data: LoginRequest):
             detail="Invalid email or password"
         )
     
-    # Verify password
-    if not bcrypt.checkpw(login_data.password.encode('utf-8'), user["password_hash"].encode('utf-8')):
+    # Verify password off the event loop
+    password_ok = await asyncio.get_running_loop().run_in_executor(
+        _pw_pool, _verify_password, login_data.password, user["password_hash"]
+    )
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # Upgrade bcrypt or outdated Argon2 hashes now that the plaintext is known to be correct
+    if _password_needs_rehash(user["password_hash"]):
+        new_hash = await asyncio.get_running_loop().run_in_executor(
+            _pw_pool, _hash_password, login_data.password
+        )
+        await db.update_user_password_hash(user["_id"], new_hash)
+    
     # Create access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = jwt.encode(
-        {"sub": user["email"], "exp": datetime.utcnow() + access_token_expires},
-        SECRET_KEY,
+        {"sub": user["email"], "exp": _utcnow() + _ACCESS_TOKEN_EXPIRES},
+        _SECRET_KEY_BYTES,
         algorithm=ALGORITHM
     )
     
@@ -156,13 +294,26 @@ async def login(login_data: LoginRequest):
         "access_token": access_token, 
         "token_type": "bearer", 
         "user": {
-            "id": str(user["_id"]),  # Convert ObjectId to string
+            "id": user["id_str"],
             "email": user["email"],
             "name": user["name"],
             "role": user["role"]
         }
     }
 
+@app.post("/auth/logout", response_model=dict)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_user),
+    db: DatabaseManager = Depends(get_database)
+):
+    """Revoke the caller's token until it would have expired anyway"""
+    token = credentials.credentials
+    payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=[ALGORITHM])
+    await db.revoke_token(_token_id(token), datetime.utcfromtimestamp(payload["exp"]))
+    _token_cache.pop(token, None)
+    return {"message": "Logged out successfully"}
+
 # Application endpoints
 @app.post("/applications", response_model=dict)
 async def create_application(
@@ -171,6 +322,7 @@ async def create_application(
 ):
     """Create a new application"""
     db = await get_database()
+    now = _utcnow()
     
     app_dict = {
         "user_id": current_user["_id"],
@@ -186,75 +338,41 @@ async def create_application(
         "extract_dynamic_links": app_data.extract_dynamic_links,
         "extract_resource_links": app_data.extract_resource_links,
         "extract_external_links": app_data.extract_external_links,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
+        "persist_valid_links": app_data.persist_valid_links,
+        "created_at": now,
+        "updated_at": now,
         "is_active": True
     }
     
     app_id = await db.create_application(app_dict)
     return {"message": "Application created successfully", "application_id": str(app_id)}
 
-@app.get("/applications", response_model=List[dict])
+@app.get("/applications", response_class=ORJSONResponse)
 async def get_applications(current_user: dict = Depends(get_current_user)):
     """Get user's applications"""
     db = await get_database()
     applications = await db.get_user_applications(current_user["_id"])
-    return applications
+    return ORJSONResponse(applications)
 
 @app.get("/applications/{app_id}", response_model=dict)
 async def get_application(
     app_id: str,
-    current_user: dict = Depends(get_current_user)
+    application: dict = Depends(get_owned_application)
 ):
     """Get specific application"""
-    db = await get_database()
-    application = await db.get_application_by_id(app_id)
-    
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
-    
-    if application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
     return application
 
 @app.put("/applications/{app_id}", response_model=dict)
 async def update_application(
     app_id: str,
     app_data: ApplicationUpdate,
-    current_user: dict = Depends(get_current_user)
+    application: dict = Depends(get_owned_application),
+    db: DatabaseManager = Depends(get_database)
 ):
     """Update application"""
-    db = await get_database()
-    
-    # Check if application exists and belongs to user
-    application = await db.get_application_by_id(app_id)
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
-    
-    if application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
     # Prepare update data
-    update_data = {"updated_at": datetime.utcnow()}
-    for field, value in app_data.dict(exclude_unset=True).items():
-        if value is not None:
-            if field == "website_url":
-                update_data[field] = str(value)
-            else:
-                update_data[field] = value
+    update_data = app_data.model_dump(mode="json", exclude_unset=True, exclude_none=True)
+    update_data["updated_at"] = _utcnow()
     
     success = await db.update_application(app_id, update_data)
     if not success:
@@ -269,80 +387,35 @@ async def update_application(
 async def partial_update_application(
     app_id: str,
     app_data: ApplicationUpdate,
-    current_user: dict = Depends(get_current_user)
+    application: dict = Depends(get_owned_application),
+    db: DatabaseManager = Depends(get_database)
 ):
     """Partially update application (PATCH)"""
-    try:
-        db = await get_database()
-        
-        # Check if application exists and belongs to user
-        application = await db.get_application_by_id(app_id)
-        if not application:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
-        if application["user_id"] != str(current_user["_id"]):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
-            )
-        
-        # Prepare update data - only include fields that are provided
-        update_data = {"updated_at": datetime.utcnow()}
-        for field, value in app_data.dict(exclude_unset=True).items():
-            if value is not None:
-                if field == "website_url":
-                    update_data[field] = str(value)
-                else:
-                    update_data[field] = value
-        
-        logger.info(f"Updating application {app_id} with data: {update_data}")
-        
-        # Update application
-        updated_app = await db.update_application(app_id, update_data)
-        if not updated_app:
-            logger.error(f"Failed to update application {app_id}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update application"
-            )
-        
-        logger.info(f"Successfully updated application {app_id}")
-        return {"message": "Application updated successfully", "application": updated_app}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error updating application {app_id}: {e}")
+    # Prepare update data - only include fields that are provided
+    update_data = app_data.model_dump(mode="json", exclude_unset=True, exclude_none=True)
+    update_data["updated_at"] = _utcnow()
+    
+    logger.info("Updating application %s with data: %s", app_id, update_data)
+    
+    # Update application
+    updated_app = await db.update_application(app_id, update_data)
+    if not updated_app:
+        logger.error("Failed to update application %s", app_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
+            detail="Failed to update application"
         )
+    
+    logger.info("Successfully updated application %s", app_id)
+    return {"message": "Application updated successfully", "application": updated_app}
 
 @app.delete("/applications/{app_id}", response_model=dict)
 async def delete_application(
     app_id: str,
-    current_user: dict = Depends(get_current_user)
+    application: dict = Depends(get_owned_application),
+    db: DatabaseManager = Depends(get_database)
 ):
     """Delete application"""
-    db = await get_database()
-    
-    # Check if application exists and belongs to user
-    application = await db.get_application_by_id(app_id)
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
-    
-    if application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
     success = await db.delete_application(app_id)
     if not success:
         raise HTTPException(
@@ -357,36 +430,22 @@ async def delete_application(
 async def start_analysis_run(
     app_id: str,
     background_tasks: BackgroundTasks,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    application: dict = Depends(get_owned_application),
+    db: DatabaseManager = Depends(get_database)
 ):
     """Start a new analysis run"""
-    db = await get_database()
-    
-    # Check if application exists and belongs to user
-    application = await db.get_application_by_id(app_id)
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
-    
-    if application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
     # Create analysis run
     run_dict = {
         "application_id": app_id,
         "status": AnalysisStatus.PENDING.value,
-        "created_at": datetime.utcnow()
+        "created_at": _utcnow()
     }
     
     run_id = await db.create_analysis_run(run_dict)
     
     # Queue analysis task with Celery
-    logger.info(f"Application data for analysis: {application}")
+    logger.debug("Application data for analysis: %s", application)
     app_data = {
         "website_url": application["website_url"],
         "max_crawl_depth": application["max_crawl_depth"],
@@ -398,6 +457,7 @@ async def start_analysis_run(
         "extract_dynamic_links": application.get("extract_dynamic_links", False),
         "extract_resource_links": application.get("extract_resource_links", False),
         "extract_external_links": application.get("extract_external_links", False),
+        "persist_valid_links": application.get("persist_valid_links", False),
         "name": application["name"],
         "user_email": current_user["email"],
         "send_notifications": False
@@ -411,33 +471,27 @@ async def start_analysis_run(
         "task_id": task.id
     }
 
-@app.get("/applications/{app_id}/runs", response_model=List[dict])
+@app.get("/applications/{app_id}/runs", response_class=ORJSONResponse)
 async def get_analysis_runs(
     app_id: str,
     limit: int = 10,
-    current_user: dict = Depends(get_current_user)
+    application: dict = Depends(get_owned_application),
+    db: DatabaseManager = Depends(get_database)
 ):
     """Get analysis runs for an application"""
-    db = await get_database()
-    
-    # Check if application exists and belongs to user
-    application = await db.get_application_by_id(app_id)
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
-    
-    if application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
     runs = await db.get_analysis_runs(app_id, limit)
-    return runs
+    return ORJSONResponse(runs)
+
+# Run fields the runs list view reads; progress/task bookkeeping stays in Mongo
+RUN_LIST_FIELDS = {
+    field: 1 for field in (
+        "application_id", "status", "created_at", "started_at", "completed_at", "error_message",
+        "total_pages_analyzed", "total_links_found", "broken_links_count", "blank_pages_count",
+        "content_pages_count", "overall_score"
+    )
+}
 
-@app.get("/runs", response_model=List[dict])
+@app.get("/runs", response_class=ORJSONResponse)
 async def get_all_analysis_runs(
     limit: int = 50,
     current_user: dict = Depends(get_current_user)
@@ -446,12 +500,13 @@ async def get_all_analysis_runs(
     db = await get_database()
     
     # Get all analysis runs for the user
-    runs = await db.get_all_analysis_runs_for_user(str(current_user["_id"]), limit)
+    runs = await db.get_all_analysis_runs_for_user(current_user["id_str"], limit, fields=RUN_LIST_FIELDS)
     
-    # Enhance runs with application details
+    # Enhance runs with application details, fetched in a single query
+    app_map = await db.get_applications_by_ids(list({run["application_id"] for run in runs}))
     enhanced_runs = []
     for run in runs:
-        application = await db.get_application_by_id(run["application_id"])
+        application = app_map.get(run["application_id"])
         enhanced_run = {
             **run,
             "application_name": application.get("name", "Unknown") if application else "Unknown",
@@ -459,75 +514,49 @@ async def get_all_analysis_runs(
         }
         enhanced_runs.append(enhanced_run)
     
-    return enhanced_runs
+    return ORJSONResponse(enhanced_runs)
 
 @app.get("/runs/{run_id}", response_model=AnalysisRunResponse)
 async def get_analysis_run(
     run_id: str,
-    current_user: dict = Depends(get_current_user)
+    run: dict = Depends(get_owned_run),
+    db: DatabaseManager = Depends(get_database)
 ):
     """Get specific analysis run with results"""
-    db = await get_database()
-    
-    # Get analysis run
-    run = await db.get_analysis_run_by_id(run_id)
-    if not run:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Analysis run not found"
-        )
-    
-    # Check if application belongs to user
-    application = await db.get_application_by_id(run["application_id"])
-    if not application or application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
-    # Get results
-    results = await db.get_analysis_results(run_id)
-    link_validations = await db.get_link_validations(run_id)
-    change_detection = await db.get_change_detection(run_id)
+    # Get results; the three reads are independent
+    results, link_validations, change_detection = await asyncio.gather(
+        db.get_analysis_results(run_id),
+        db.get_link_validations(run_id),
+        db.get_change_detection(run_id)
+    )
     
-    return AnalysisRunResponse(
+    # Serialize in one pass through pydantic-core; returning a Response skips the response_model re-validation
+    response = AnalysisRunResponse(
         run=run,
         results=results,
         link_validations=link_validations,
         change_detection=change_detection
     )
+    return Response(content=response.model_dump_json(), media_type="application/json")
+
+def _revoke_task(task_id: str):
+    """Revoke and terminate a Celery task (blocking broker call, run as a background task)"""
+    try:
+        celery_app.control.revoke(task_id, terminate=True)
+    except Exception as e:
+        logger.warning("Failed to revoke task %s: %s", task_id, e)
 
 @app.delete("/runs/{run_id}")
 async def delete_analysis_run(
     run_id: str,
-    current_user: dict = Depends(get_current_user)
+    background_tasks: BackgroundTasks,
+    run: dict = Depends(get_owned_run),
+    db: DatabaseManager = Depends(get_database)
 ):
     """Delete an analysis run and stop any running tasks"""
-    db = await get_database()
-    
-    # Get analysis run
-    run = await db.get_analysis_run_by_id(run_id)
-    if not run:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Analysis run not found"
-        )
-    
-    # Check if application belongs to user
-    application = await db.get_application_by_id(run["application_id"])
-    if not application or application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
-    # If task is running, try to revoke it
+    # If task is running, revoke it after the response is sent
     if run.get("status") == "running" and run.get("task_id"):
-        try:
-            from celery_app import celery_app
-            celery_app.control.revoke(run["task_id"], terminate=True)
-        except Exception as e:
-            print(f"Failed to revoke task {run['task_id']}: {e}")
+        background_tasks.add_task(_revoke_task, run["task_id"])
     
     # Delete the run and all related data
     success = await db.delete_analysis_run(run_id)
@@ -552,34 +581,20 @@ async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
 async def create_schedule(
     app_id: str,
     schedule_data: ScheduleCreate,
-    current_user: dict = Depends(get_current_user)
+    application: dict = Depends(get_owned_application),
+    db: DatabaseManager = Depends(get_database)
 ):
     """Create a new schedule"""
-    db = await get_database()
-    
-    # Check if application exists and belongs to user
-    application = await db.get_application_by_id(app_id)
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
-    
-    if application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
     # Create schedule
+    now = _utcnow()
     schedule_dict = {
         "application_id": app_id,
         "frequency": schedule_data.frequency.value,
         "cron_expression": schedule_data.cron_expression,
         "is_active": schedule_data.is_active,
         "next_run": schedule_data.next_run,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "created_at": now,
+        "updated_at": now
     }
     
     schedule_id = await db.create_schedule(schedule_dict)
@@ -588,25 +603,10 @@ async def create_schedule(
 @app.get("/applications/{app_id}/schedules", response_model=List[dict])
 async def get_schedules(
     app_id: str,
-    current_user: dict = Depends(get_current_user)
+    application: dict = Depends(get_owned_application),
+    db: DatabaseManager = Depends(get_database)
 ):
     """Get schedules for an application"""
-    db = await get_database()
-    
-    # Check if application exists and belongs to user
-    application = await db.get_application_by_id(app_id)
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
-    
-    if application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
     schedules = await db.get_application_schedules(app_id)
     return schedules
 
@@ -614,27 +614,10 @@ async def get_schedules(
 @app.get("/runs/{run_id}/context-comparison", response_model=ContextComparison)
 async def get_context_comparison(
     run_id: str,
-    current_user: dict = Depends(get_current_user)
+    run: dict = Depends(get_owned_run),
+    db: DatabaseManager = Depends(get_database)
 ):
     """Get context comparison for a run"""
-    db = await get_database()
-    
-    # Get analysis run
-    run = await db.get_analysis_run_by_id(run_id)
-    if not run:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Analysis run not found"
-        )
-    
-    # Check if application belongs to user
-    application = await db.get_application_by_id(run["application_id"])
-    if not application or application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
     # Get change detection
     change_detection = await db.get_change_detection(run_id)
     
@@ -662,30 +645,11 @@ async def get_context_comparison(
 @app.post("/runs/{run_id}/content-analysis")
 async def run_content_analysis(
     run_id: str,
-    current_user: dict = Depends(get_current_user)
+    run: dict = Depends(get_owned_run)
 ):
     """Run AI-powered content analysis on a specific run"""
-    db = await get_database()
-    
-    # Get analysis run
-    run = await db.get_analysis_run_by_id(run_id)
-    if not run:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Analysis run not found"
-        )
-    
-    # Check if application belongs to user
-    application = await db.get_application_by_id(run["application_id"])
-    if not application or application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
     # Queue content analysis task
-    from celery_tasks import run_content_analysis
-    task = run_content_analysis.delay(run_id)
+    task = run_content_analysis_task.delay(run_id)
     
     return {
         "message": "Content analysis started",
@@ -697,29 +661,10 @@ async def run_content_analysis(
 async def get_content_analysis_status(
     run_id: str,
     task_id: str,
-    current_user: dict = Depends(get_current_user)
+    run: dict = Depends(get_owned_run)
 ):
     """Get status of content analysis task"""
-    db = await get_database()
-    
-    # Get analysis run
-    run = await db.get_analysis_run_by_id(run_id)
-    if not run:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Analysis run not found"
-        )
-    
-    # Check if application belongs to user
-    application = await db.get_application_by_id(run["application_id"])
-    if not application or application["user_id"] != str(current_user["_id"]):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
     # Get task status
-    from celery_app import celery_app
     task = celery_app.AsyncResult(task_id)
     
     return {
@@ -739,8 +684,10 @@ async def get_content_comparison(
     db = await get_database()
     
     # Get both analysis runs
-    current_run = await db.get_analysis_run_by_id(run_id)
-    previous_run = await db.get_analysis_run_by_id(previous_run_id)
+    current_run, previous_run = await asyncio.gather(
+        db.get_analysis_run_by_id(run_id),
+        db.get_analysis_run_by_id(previous_run_id)
+    )
     
     if not current_run or not previous_run:
         raise HTTPException(
@@ -749,11 +696,13 @@ async def get_content_comparison(
         )
     
     # Check if applications belong to user
-    current_app = await db.get_application_by_id(current_run["application_id"])
-    previous_app = await db.get_application_by_id(previous_run["application_id"])
+    current_app, previous_app = await asyncio.gather(
+        db.get_application_by_id(current_run["application_id"]),
+        db.get_application_by_id(previous_run["application_id"])
+    )
     
-    if (not current_app or current_app["user_id"] != str(current_user["_id"]) or
-        not previous_app or previous_app["user_id"] != str(current_user["_id"])):
+    if (not current_app or not _eq(current_app["user_id"], current_user["id_str"]) or
+        not previous_app or not _eq(previous_app["user_id"], current_user["id_str"])):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
@@ -774,7 +723,6 @@ async def get_content_comparison(
 async def get_task_status_endpoint(task_id: str):
     """Get status of a Celery task"""
     try:
-        from celery_app import celery_app
         task = celery_app.AsyncResult(task_id)
         
         # Handle different task states with comprehensive error handling
@@ -843,14 +791,27 @@ async def get_task_status_endpoint(task_id: str):
             "error": str(e)
         }
 
+def _inspect_workers(method: str) -> dict:
+    """Run one Celery control broadcast (stats/active/scheduled), waiting at most 1s for replies (blocking)"""
+    return getattr(celery_app.control.inspect(timeout=1.0), method)() or {}
+
 @app.get("/tasks/workers/stats")
 async def get_worker_stats():
     """Get Celery worker statistics"""
     try:
-        from celery_tasks import get_worker_stats
-        result = get_worker_stats.delay()
-        stats = result.get(timeout=10)
-        return stats
+        # Broadcast straight to the workers instead of round-tripping a task; the three
+        # broadcasts run in parallel threads so the whole call is bounded by one 1s timeout
+        loop = asyncio.get_running_loop()
+        workers, active_tasks, scheduled_tasks = await asyncio.gather(*(
+            loop.run_in_executor(None, _inspect_workers, method)
+            for method in ("stats", "active", "scheduled")
+        ))
+        return {
+            "workers": workers,
+            "active_tasks": active_tasks,
+            "scheduled_tasks": scheduled_tasks,
+            "timestamp": _utcnow().isoformat()
+        }
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -862,7 +823,7 @@ async def get_worker_stats():
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """Get current user information"""
     return {
-        "id": str(current_user["_id"]),  # Convert ObjectId to string
+        "id": current_user["id_str"],
         "email": current_user["email"],
         "name": current_user["name"],
         "role": current_user["role"]
@@ -873,25 +834,15 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
 async def get_broken_link_details(
     run_id: str,
     broken_url: str,
-    current_user: dict = Depends(get_current_user),
+    run: dict = Depends(get_owned_run),
     db: DatabaseManager = Depends(get_database)
 ):
     """Get detailed information about a broken link including parent and source code"""
     try:
         # Decode the URL parameter (it comes URL-encoded from the frontend)
         decoded_broken_url = unquote(broken_url)
-        logger.info(f"Original broken_url: {broken_url}")
-        logger.info(f"Decoded broken_url: {decoded_broken_url}")
-        
-        # Verify the run belongs to the user
-        run = await db.get_analysis_run_by_id(run_id)
-        if not run:
-            raise HTTPException(status_code=404, detail="Run not found")
-        
-        # Check if application belongs to user
-        application = await db.get_application_by_id(run["application_id"])
-        if not application or application["user_id"] != str(current_user["_id"]):
-            raise HTTPException(status_code=404, detail="Run not found")
+        logger.info("Original broken_url: %s", broken_url)
+        logger.info("Decoded broken_url: %s", decoded_broken_url)
         
         # Get broken link with parent info using the decoded URL
         broken_link_info = await db.get_broken_link_with_parent_info(run_id, decoded_broken_url)
@@ -917,53 +868,43 @@ async def get_broken_link_details(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting broken link details: {e}")
+        logger.error("Error getting broken link details: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/runs/{run_id}/source-code", response_model=SourceCodeResponse)
 async def get_page_source_code(
     run_id: str,
     page_url: str,
-    current_user: dict = Depends(get_current_user),
+    run: dict = Depends(get_owned_run),
     db: DatabaseManager = Depends(get_database)
 ):
     """Get HTML source code for a page with highlighted links"""
     try:
         # Decode the URL parameter (it comes URL-encoded from the frontend)
         decoded_page_url = unquote(page_url)
-        logger.info(f"Original page_url: {page_url}")
-        logger.info(f"Decoded page_url: {decoded_page_url}")
-        
-        # Verify the run belongs to the user
-        run = await db.get_analysis_run_by_id(run_id)
-        if not run:
-            raise HTTPException(status_code=404, detail="Run not found")
-        
-        # Check if application belongs to user
-        application = await db.get_application_by_id(run["application_id"])
-        if not application or application["user_id"] != str(current_user["_id"]):
-            raise HTTPException(status_code=404, detail="Run not found")
+        logger.info("Original page_url: %s", page_url)
+        logger.info("Decoded page_url: %s", decoded_page_url)
         
         # Get source code using the decoded URL
-        logger.info(f"Looking for source code for run_id: {run_id}, page_url: {decoded_page_url}")
+        logger.info("Looking for source code for run_id: %s, page_url: %s", run_id, decoded_page_url)
         source_data = await db.get_page_source_code(run_id, decoded_page_url)
         
         # If source code not found, try to get it from parent page (for broken links)
         if not source_data:
-            logger.warning(f"Source code not found for run_id: {run_id}, page_url: {decoded_page_url}")
+            logger.warning("Source code not found for run_id: %s, page_url: %s", run_id, decoded_page_url)
             
             # Get parent-child relationships to find the parent page
             relationships = await db.get_parent_child_relationships(run_id)
             if relationships and "parent_map" in relationships:
                 parent_url = relationships["parent_map"].get(decoded_page_url)
                 if parent_url:
-                    logger.info(f"Trying to get source code from parent page: {parent_url}")
+                    logger.info("Trying to get source code from parent page: %s", parent_url)
                     source_data = await db.get_page_source_code(run_id, parent_url)
                     if source_data:
                         # Update the page_url to show the broken link URL but use parent's source code
                         source_data["page_url"] = decoded_page_url
                         source_data["parent_url"] = parent_url
-                        logger.info(f"Found source code from parent page: {parent_url}")
+                        logger.info("Found source code from parent page: %s", parent_url)
             
             if not source_data:
                 raise HTTPException(status_code=404, detail="Source code not found")
@@ -1016,21 +957,11 @@ async def get_page_source_code(
 @app.get("/runs/{run_id}/parent-child-relationships", response_model=ParentChildRelationships)
 async def get_parent_child_relationships(
     run_id: str,
-    current_user: dict = Depends(get_current_user),
+    run: dict = Depends(get_owned_run),
     db: DatabaseManager = Depends(get_database)
 ):
     """Get parent-child relationships for a run"""
     try:
-        # Verify the run belongs to the user
-        run = await db.get_analysis_run_by_id(run_id)
-        if not run:
-            raise HTTPException(status_code=404, detail="Run not found")
-        
-        # Check if application belongs to user
-        application = await db.get_application_by_id(run["application_id"])
-        if not application or application["user_id"] != str(current_user["_id"]):
-            raise HTTPException(status_code=404, detail="Run not found")
-        
         # Get relationships
         relationships = await db.get_parent_child_relationships(run_id)
         if not relationships:
@@ -1048,21 +979,11 @@ async def get_parent_child_relationships(
 @app.post("/runs/{run_id}/export-json", response_model=dict)
 async def export_analysis_results_to_json(
     run_id: str,
-    current_user: dict = Depends(get_current_user),
+    run: dict = Depends(get_owned_run),
     db: DatabaseManager = Depends(get_database)
 ):
     """Export complete analysis results to JSON file for debugging and verification"""
     try:
-        # Verify the run belongs to the user
-        run = await db.get_analysis_run_by_id(run_id)
-        if not run:
-            raise HTTPException(status_code=404, detail="Analysis run not found")
-        
-        # Check if application belongs to user
-        application = await db.get_application_by_id(run["application_id"])
-        if not application or application["user_id"] != str(current_user["_id"]):
-            raise HTTPException(status_code=403, detail="Access denied")
-        
         # Export to JSON
         filepath = await db.export_analysis_results_to_json(run_id)
         
@@ -1070,7 +991,7 @@ async def export_analysis_results_to_json(
             "message": "Analysis results exported successfully",
             "filepath": filepath,
             "run_id": run_id,
-            "exported_at": datetime.utcnow().isoformat()
+            "exported_at": _utcnow().isoformat()
         }
         
     except HTTPException:
@@ -1083,7 +1004,7 @@ async def export_analysis_results_to_json(
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.utcnow()}
+    return {"status": "healthy", "timestamp": _utcnow()}
 
 # Root endpoint
 @app.get("/", response_class=HTMLResponse)
@@ -5,11 +5,15 @@ Integrates with the existing website analysis system
 
 import asyncio
 import logging
-from typing import Dict, Any, List
-from datetime import datetime
+from itertools import chain
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+
+from bson import ObjectId
 
 from .main import WebsiteInsightsPlatform
-from ..database.database_schema import DatabaseManager
+from ..database.database_schema import DatabaseManager, get_database
+from ..utils.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -23,11 +27,29 @@ debug_handler.setFormatter(debug_formatter)
 debug_logger.addHandler(debug_handler)
 debug_logger.propagate = False  # Don't propagate to root logger
 
+async def _noop():
+    """Placeholder awaitable for a skipped step in an asyncio.gather"""
+    return None
+
+def next_scheduled_run(frequency: str, consecutive_empty_runs: int = 0) -> datetime:
+    """Next run time for a schedule, backed off exponentially while its runs keep coming back empty"""
+    if frequency == "weekly":
+        interval = timedelta(weeks=1)
+    elif frequency == "monthly":
+        interval = timedelta(days=30)
+    else:
+        # Daily; custom cron expressions are not parsed yet and also default to daily
+        interval = timedelta(days=1)
+    
+    return datetime.utcnow() + interval * 2 ** min(consecutive_empty_runs, settings.max_empty_run_backoff)
+
 class AnalysisEngine:
     """Analysis engine for running website analysis"""
     
-    def __init__(self):
+    def __init__(self, db: Optional[DatabaseManager] = None):
         self.platform = WebsiteInsightsPlatform()
+        # Shared pooled connection; falls back to the process-wide manager from get_database()
+        self.db = db
     
     async def analyze_website(
         self,
@@ -47,17 +69,9 @@ class AnalysisEngine:
         logger.info(f"Starting analysis for {website_url}")
         
         # Generate a unique run_id for this analysis
-        from bson import ObjectId
         run_id = str(ObjectId())
         logger.info(f"Generated run_id: {run_id}")
         
-        # Set environment variables for the analysis
-        import os
-        os.environ["MAX_PAGES_TO_CRAWL"] = str(max_pages_to_crawl)
-        os.environ["MAX_LINKS_TO_VALIDATE"] = str(max_links_to_validate)
-        os.environ["ENABLE_AI_EVALUATION"] = str(enable_ai_evaluation).lower()
-        os.environ["MAX_AI_EVALUATION_PAGES"] = str(max_ai_evaluation_pages)
-        
         try:
             # Run the analysis using the existing platform
             results = await self.platform.analyze_website(
@@ -69,7 +83,9 @@ class AnalysisEngine:
                 extract_static=extract_static,
                 extract_dynamic=extract_dynamic,
                 extract_resources=extract_resources,
-                extract_external=extract_external
+                extract_external=extract_external,
+                enable_ai_evaluation=enable_ai_evaluation,
+                max_ai_evaluation_pages=max_ai_evaluation_pages
             )
             
             # Add run_id to results
@@ -78,10 +94,9 @@ class AnalysisEngine:
             
             # Save results to database
             try:
-                from database_schema import DatabaseManager
-                db = DatabaseManager()
-                await db.connect()
-                await self.save_results_to_db(db, run_id, results)
+                if self.db is None:
+                    self.db = await get_database()
+                await self.save_results_to_db(self.db, run_id, results)
                 logger.info(f"Results saved to database for run_id: {run_id}")
             except Exception as e:
                 logger.error(f"Failed to save results to database: {e}")
@@ -96,151 +111,144 @@ class AnalysisEngine:
         self,
         db: DatabaseManager,
         run_id: str,
-        results: Dict[str, Any]
-    ):
-        """Save analysis results to database"""
+        results: Dict[str, Any],
+        persist_valid_links: bool = False
+    ) -> bool:
+        """Save analysis results to database; valid links are only stored when persist_valid_links is set.
+        Returns False without touching the database when the crawl produced no pages."""
+        
+        debug_logger.info("Starting save_results_to_db for run_id: %s", run_id)
+        
+        detailed_findings = results.get("detailed_findings") or {}
+        if not any((
+            detailed_findings.get("content_pages"),
+            detailed_findings.get("blank_pages"),
+            detailed_findings.get("error_pages")
+        )):
+            logger.info("No pages found for run %s, nothing to save", run_id)
+            return False
         
-        debug_logger.info(f"Starting save_results_to_db for run_id: {run_id}")
+        # One timestamp for every document written by this run
+        now = datetime.utcnow()
         
         try:
-            # Save analysis results
-            analysis_results = []
-            for page in results.get("detailed_findings", {}).get("content_pages", []):
-                analysis_results.append({
-                    "run_id": run_id,
-                    "page_url": page["url"],
-                    "page_title": page.get("title"),
-                    "word_count": page.get("word_count", 0),
-                    "page_type": "content",
-                    "has_header": page.get("has_header", False),
-                    "has_footer": page.get("has_footer", False),
-                    "has_navigation": page.get("has_navigation", False),
-                    "path": page.get("path", []),
-                    "crawled_at": datetime.utcnow(),
-                    "created_at": datetime.utcnow()
-                })
-            
-            for page in results.get("detailed_findings", {}).get("blank_pages", []):
-                analysis_results.append({
-                    "run_id": run_id,
-                    "page_url": page["url"],
-                    "page_title": page.get("title"),
-                    "word_count": page.get("word_count", 0),
-                    "page_type": "blank",
-                    "has_header": page.get("has_header", False),
-                    "has_footer": page.get("has_footer", False),
-                    "has_navigation": page.get("has_navigation", False),
-                    "path": page.get("path", []),
-                    "crawled_at": datetime.utcnow(),
-                    "created_at": datetime.utcnow()
-                })
-            
-            for page in results.get("detailed_findings", {}).get("error_pages", []):
-                analysis_results.append({
+            # One pass over every page list, tagged by source; reused for the source-code step below
+            page_sources = (
+                ("content", detailed_findings.get("content_pages", ())),
+                ("blank", detailed_findings.get("blank_pages", ())),
+                ("error", detailed_findings.get("error_pages", ()))
+            )
+            all_pages = [(page_type, page) for page_type, pages in page_sources for page in pages]
+            analysis_results = [
+                {
                     "run_id": run_id,
                     "page_url": page["url"],
                     "page_title": page.get("title"),
                     "word_count": page.get("word_count", 0),
-                    "page_type": "error",
+                    "page_type": page_type,
                     "has_header": page.get("has_header", False),
                     "has_footer": page.get("has_footer", False),
                     "has_navigation": page.get("has_navigation", False),
                     "path": page.get("path", []),
-                    "crawled_at": datetime.utcnow(),
-                    "created_at": datetime.utcnow()
-                })
-            
-            # Save analysis results
-            if analysis_results:
-                await db.save_analysis_results(analysis_results)
-                logger.info(f"Saved {len(analysis_results)} analysis results")
+                    "crawled_at": now,
+                    "created_at": now
+                }
+                for page_type, page in all_pages
+            ]
             
             # Save link validations
-            link_validations = []
-            for link in results.get("detailed_findings", {}).get("broken_links", []):
-                link_validations.append({
+            broken_links = (
+                {
                     "run_id": run_id,
                     "url": link["url"],
                     "status_code": link.get("status_code"),
                     "status": "broken",
                     "response_time": link.get("response_time"),
                     "error_message": link.get("error"),
-                    "created_at": datetime.utcnow()
-                })
+                    "created_at": now
+                }
+                for link in detailed_findings.get("broken_links", ())
+            )
             
-            # Add valid links (if available in results)
-            for link in results.get("detailed_findings", {}).get("valid_links", []):
-                link_validations.append({
+            # Add valid links (if available in results and the application opted in)
+            valid_links = (
+                {
                     "run_id": run_id,
                     "url": link["url"],
                     "status_code": 200,
                     "status": "valid",
                     "response_time": link.get("response_time"),
-                    "created_at": datetime.utcnow()
-                })
-            
-            # Save link validations
-            if link_validations:
-                await db.save_link_validations(link_validations)
-                logger.info(f"Saved {len(link_validations)} link validations")
+                    "created_at": now
+                }
+                for link in (detailed_findings.get("valid_links", ()) if persist_valid_links else ())
+            )
+            link_validations = list(chain(broken_links, valid_links))
             
-            # Save parent-child relationships if available
-            if "path_tracking" in results and results["path_tracking"]:
-                path_tracking = results["path_tracking"]
-                debug_logger.info(f"Path tracking data keys: {list(path_tracking.keys())}")
-                debug_logger.info(f"Path tracking start_url: {path_tracking.get('start_url')}")
-                debug_logger.info(f"Path tracking parent_map count: {len(path_tracking.get('parent_map', {}))}")
-                debug_logger.info(f"Path tracking children_map count: {len(path_tracking.get('children_map', {}))}")
+            # Collect parent-child relationships if available
+            path_tracking = results.get("path_tracking")
+            relationships = None
+            if path_tracking:
+                debug_logger.info("Path tracking data keys: %s", list(path_tracking.keys()))
+                debug_logger.info("Path tracking start_url: %s", path_tracking.get('start_url'))
+                debug_logger.info("Path tracking parent_map count: %d", len(path_tracking.get('parent_map', {})))
+                debug_logger.info("Path tracking children_map count: %d", len(path_tracking.get('children_map', {})))
                 relationships = {
                     "start_url": path_tracking.get("start_url"),
                     "parent_map": path_tracking.get("parent_map", {}),
                     "children_map": path_tracking.get("children_map", {}),
                     "path_map": path_tracking.get("path_map", {})
                 }
-                debug_logger.info(f"Saving relationships with {len(relationships['parent_map'])} parent mappings, start_url: {relationships['start_url']}")
-                success = await db.save_parent_child_relationships(run_id, relationships)
-                if success:
+                debug_logger.info("Saving relationships with %d parent mappings, start_url: %s", len(relationships['parent_map']), relationships['start_url'])
+            else:
+                logger.warning("No path_tracking data found in results")
+            
+            # The three writes target independent collections, so run them concurrently
+            saved_results, saved_links, relationships_saved = await asyncio.gather(
+                db.save_analysis_results(analysis_results),
+                db.save_link_validations(link_validations),
+                db.save_parent_child_relationships(run_id, relationships) if relationships else _noop()
+            )
+            if saved_results:
+                logger.info("Saved %s analysis results", saved_results)
+            if saved_links:
+                logger.info("Saved %s link validations", saved_links)
+            if relationships:
+                if relationships_saved:
                     logger.info("Successfully saved parent-child relationships")
                 else:
                     logger.error("Failed to save parent-child relationships")
-            else:
-                logger.warning("No path_tracking data found in results")
             
             # Save page source codes for all page types
             debug_logger.info("Starting source code saving process...")
             source_codes_saved = 0
-            all_pages = []
-            all_pages.extend(results.get("detailed_findings", {}).get("content_pages", []))
-            all_pages.extend(results.get("detailed_findings", {}).get("blank_pages", []))
-            all_pages.extend(results.get("detailed_findings", {}).get("error_pages", []))
-            debug_logger.info(f"Total pages to process for source code: {len(all_pages)}")
+            debug_logger.info("Total pages to process for source code: %d", len(all_pages))
             
-            # Get parent-child relationships to optimize source code storage
-            relationships = await db.get_parent_child_relationships(run_id)
+            # Reuse the relationships just saved to decide which pages keep their source code
             parent_map = relationships.get("parent_map", {}) if relationships else {}
             children_map = relationships.get("children_map", {}) if relationships else {}
             start_url = relationships.get("start_url") if relationships else None
             
             # Debug logging for start_url
-            debug_logger.info(f"Retrieved relationships from DB: start_url={start_url}, parent_map_count={len(parent_map)}, children_map_count={len(children_map)}")
+            debug_logger.info("Using relationships: start_url=%s, parent_map_count=%d, children_map_count=%d", start_url, len(parent_map), len(children_map))
             if start_url is None:
-                debug_logger.error(f"CRITICAL: start_url is None in database relationships for run_id: {run_id}")
+                debug_logger.error("CRITICAL: start_url is None in relationships for run_id: %s", run_id)
                 # Try to get start_url from the first page's path
                 if all_pages:
-                    first_page = all_pages[0]
+                    first_page = all_pages[0][1]
                     if first_page.get("path") and len(first_page["path"]) > 0:
                         start_url = first_page["path"][0]
-                        debug_logger.info(f"Using first page path as start_url: {start_url}")
+                        debug_logger.info("Using first page path as start_url: %s", start_url)
                     else:
                         debug_logger.error("No path information available in first page")
             
-            # Track which pages we've already saved source code for
+            # Track which pages we've already queued source code for; all are written in one bulk pass
             saved_source_pages = set()
+            sources_to_save = []
             
-            for page in all_pages:
+            for page_type, page in all_pages:
                 html_content = page.get("html_content", "")
                 page_url = page.get("url", "unknown")
-                debug_logger.info(f"Processing page: {page_url}, html_content length: {len(html_content)}")
+                debug_logger.debug("Processing %s page: %s, html_content length: %d", page_type, page_url, len(html_content))
                 
                 if html_content:
                     # Get parent URL from path
@@ -249,7 +257,8 @@ class AnalysisEngine:
                         parent_url = page["path"][-2]  # Second to last in path
                     
                     # Determine if this page has children (is a parent at any depth)
-                    has_children = page_url in children_map and len(children_map[page_url]) > 0
+                    children = children_map.get(page_url)
+                    has_children = bool(children)
                     
                     # Always save source code for the start URL (root)
                     is_start_url = (page_url == start_url)
@@ -260,53 +269,48 @@ class AnalysisEngine:
                     # Leaf pages (no children) will get their source code from their nearest parent via the API
                     if (has_children or is_start_url) and page_url not in saved_source_pages:
                         if is_start_url:
-                            debug_logger.info(f"Saving source code for START URL (root): {page_url}, content length: {len(html_content)}")
-                        else:
-                            debug_logger.info(f"Saving source code for PARENT page (has {len(children_map.get(page_url, set()))} children): {page_url}, content length: {len(html_content)}")
-                        success = await db.save_page_source_code(
-                            run_id, 
-                            page_url, 
-                            html_content, 
-                            parent_url
-                        )
-                        if success:
-                            source_codes_saved += 1
-                            saved_source_pages.add(page_url)
-                            debug_logger.info(f"Successfully saved source code for parent page: {page_url}")
+                            debug_logger.debug("Saving source code for START URL (root): %s, content length: %d", page_url, len(html_content))
                         else:
-                            debug_logger.error(f"Failed to save source code for parent page: {page_url}")
+                            debug_logger.debug("Saving source code for PARENT page (has %d children): %s, content length: %d", len(children), page_url, len(html_content))
+                        sources_to_save.append((page_url, html_content, parent_url))
+                        saved_source_pages.add(page_url)
                     elif not has_children:
-                        debug_logger.info(f"Skipping source code save for LEAF page: {page_url} (no children - will use parent's source)")
+                        debug_logger.debug("Skipping source code save for LEAF page: %s (no children - will use parent's source)", page_url)
                     else:
-                        debug_logger.info(f"Skipping duplicate source code save for parent page: {page_url}")
+                        debug_logger.debug("Skipping duplicate source code save for parent page: %s", page_url)
                 else:
-                    debug_logger.warning(f"Page {page_url} has no html_content (length: {len(html_content)})")
+                    debug_logger.warning("Page %s has no html_content (length: %d)", page_url, len(html_content))
+            
+            if sources_to_save:
+                source_codes_saved = await db.save_page_source_codes(run_id, sources_to_save)
             
             if source_codes_saved > 0:
-                debug_logger.info(f"Saved {source_codes_saved} page source codes")
+                debug_logger.info("Saved %s page source codes", source_codes_saved)
             else:
-                debug_logger.error(f"CRITICAL: No source codes were saved! This indicates a major issue.")
+                debug_logger.error("CRITICAL: No source codes were saved! This indicates a major issue.")
             
             # Save change detection if available
-            if "change_detection" in results:
+            change_detection = results.get("change_detection")
+            if change_detection:
                 change_data = {
                     "run_id": run_id,
-                    "previous_run_id": results["change_detection"].get("previous_run_id"),
-                    "new_pages_count": len(results["change_detection"].get("new_pages", [])),
-                    "removed_pages_count": len(results["change_detection"].get("removed_pages", [])),
-                    "modified_pages_count": len(results["change_detection"].get("modified_pages", [])),
-                    "unchanged_pages_count": len(results["change_detection"].get("unchanged_pages", [])),
-                    "changes_summary": results["change_detection"],
-                    "created_at": datetime.utcnow()
+                    "previous_run_id": change_detection.get("previous_run_id"),
+                    "new_pages_count": len(change_detection.get("new_pages", ())),
+                    "removed_pages_count": len(change_detection.get("removed_pages", ())),
+                    "modified_pages_count": len(change_detection.get("modified_pages", ())),
+                    "unchanged_pages_count": len(change_detection.get("unchanged_pages", ())),
+                    "changes_summary": change_detection,
+                    "created_at": now
                 }
                 
                 await db.save_change_detection(change_data)
                 logger.info("Saved change detection results")
             
-            logger.info(f"Successfully saved all results for run {run_id}")
+            logger.info("Successfully saved all results for run %s", run_id)
+            return True
             
         except Exception as e:
-            logger.error(f"Failed to save results for run {run_id}: {e}")
+            logger.error("Failed to save results for run %s: %s", run_id, e)
             raise
 
 class SchedulerEngine:
@@ -317,7 +321,6 @@ class SchedulerEngine:
     
     async def initialize(self):
         """Initialize the scheduler"""
-        from database_schema import get_database
         self.db = await get_database()
     
     async def get_schedules_to_run(self) -> List[Dict[str, Any]]:
@@ -325,16 +328,15 @@ class SchedulerEngine:
         if not self.db:
             await self.initialize()
         
-        # Get active schedules where next_run is due
-        now = datetime.utcnow()
-        schedules = await self.db.get_active_schedules()
-        
-        schedules_to_run = []
-        for schedule in schedules:
-            if schedule.get("next_run") and schedule["next_run"] <= now:
-                schedules_to_run.append(schedule)
-        
-        return schedules_to_run
+        # Due-time filter runs in Mongo on the (is_active, next_run) index
+        return await self.db.get_active_schedules(due_before=datetime.utcnow())
+    
+    async def seconds_until_next_run(self) -> float:
+        """Seconds until the earliest active schedule is due, capped at the 60-second poll interval"""
+        next_run = await self.db.get_next_schedule_run()
+        if next_run is None:
+            return 60
+        return min(60, max(1, (next_run - datetime.utcnow()).total_seconds()))
     
     async def run_scheduled_analysis(self, schedule: Dict[str, Any]):
         """Run analysis for a scheduled task"""
@@ -342,7 +344,7 @@ class SchedulerEngine:
             # Get application details
             application = await self.db.get_application_by_id(schedule["application_id"])
             if not application:
-                logger.error(f"Application not found for schedule {schedule['_id']}")
+                logger.error("Application not found for schedule %s", schedule['_id'])
                 return
             
             # Create analysis run
@@ -355,7 +357,7 @@ class SchedulerEngine:
             run_id = await self.db.create_analysis_run(run_dict)
             
             # Run analysis
-            analysis_engine = AnalysisEngine()
+            analysis_engine = AnalysisEngine(db=self.db)
             results = await analysis_engine.analyze_website(
                 application["website_url"],
                 application["max_crawl_depth"],
@@ -366,27 +368,36 @@ class SchedulerEngine:
             )
             
             # Save results
-            await analysis_engine.save_results_to_db(self.db, run_id, results)
+            saved = await analysis_engine.save_results_to_db(
+                self.db, run_id, results,
+                persist_valid_links=application.get("persist_valid_links", False)
+            )
+            
+            # Track empty runs so dead sites are polled less and less often
+            empty_runs = 0 if saved else schedule.get("consecutive_empty_runs", 0) + 1
+            await self.db.update_schedule_empty_runs(schedule["_id"], empty_runs)
+            schedule["consecutive_empty_runs"] = empty_runs
             
             # Update run status
+            summary = results.get("summary") or {}
             await self.db.update_analysis_run(run_id, {
-                "status": "completed",
+                "status": "completed" if saved else "completed-empty",
                 "completed_at": datetime.utcnow(),
-                "total_pages_analyzed": results.get("summary", {}).get("total_pages_analyzed", 0),
-                "total_links_found": results.get("summary", {}).get("total_links_found", 0),
-                "broken_links_count": results.get("summary", {}).get("broken_links", 0),
-                "blank_pages_count": results.get("summary", {}).get("blank_pages", 0),
-                "content_pages_count": results.get("summary", {}).get("content_pages", 0),
+                "total_pages_analyzed": summary.get("total_pages_analyzed", 0),
+                "total_links_found": summary.get("total_links_found", 0),
+                "broken_links_count": summary.get("broken_links", 0),
+                "blank_pages_count": summary.get("blank_pages", 0),
+                "content_pages_count": summary.get("content_pages", 0),
                 "overall_score": results.get("overall_score", 0)
             })
             
             # Update next run time
             await self._update_next_run_time(schedule)
             
-            logger.info(f"Scheduled analysis completed for application {application['name']}")
+            logger.info("Scheduled analysis completed for application %s", application['name'])
             
         except Exception as e:
-            logger.error(f"Scheduled analysis failed for schedule {schedule['_id']}: {e}")
+            logger.error("Scheduled analysis failed for schedule %s: %s", schedule['_id'], e)
             
             # Update run status to failed if run was created
             if 'run_id' in locals():
@@ -398,23 +409,8 @@ class SchedulerEngine:
     
     async def _update_next_run_time(self, schedule: Dict[str, Any]):
         """Update next run time for a schedule"""
-        from datetime import timedelta
-        
-        frequency = schedule["frequency"]
-        now = datetime.utcnow()
-        
-        if frequency == "daily":
-            next_run = now + timedelta(days=1)
-        elif frequency == "weekly":
-            next_run = now + timedelta(weeks=1)
-        elif frequency == "monthly":
-            next_run = now + timedelta(days=30)
-        else:
-            # For custom schedules, you would parse the cron expression
-            # For now, default to daily
-            next_run = now + timedelta(days=1)
-        
-        await self.db.update_schedule_next_run(schedule["_id"], next_run.isoformat())
+        next_run = next_scheduled_run(schedule["frequency"], schedule.get("consecutive_empty_runs", 0))
+        await self.db.update_schedule_next_run(schedule["_id"], next_run)
     
     async def run_scheduler_loop(self):
         """Main scheduler loop"""
@@ -428,12 +424,17 @@ class SchedulerEngine:
                 if schedules:
                     logger.info(f"Found {len(schedules)} schedules to run")
                     
-                    # Run each schedule
-                    for schedule in schedules:
-                        await self.run_scheduled_analysis(schedule)
+                    # Run due schedules concurrently, bounded; one failing run must not abort the tick
+                    semaphore = asyncio.Semaphore(settings.max_concurrent_scheduled_runs)
+                    
+                    async def _run(schedule: Dict[str, Any]):
+                        async with semaphore:
+                            await self.run_scheduled_analysis(schedule)
+                    
+                    await asyncio.gather(*(_run(schedule) for schedule in schedules), return_exceptions=True)
                 
-                # Wait before checking again (check every minute)
-                await asyncio.sleep(60)
+                # Sleep until the next schedule is due; still poll at least every minute to see new schedules
+                await asyncio.sleep(await self.seconds_until_next_run())
                 
             except Exception as e:
                 logger.error(f"Error in scheduler loop: {e}")
@@ -5,13 +5,14 @@ from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
 import statistics
+from functools import lru_cache
 
 # Add project root to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from backend.utils.models import PageContent, EvaluationResult, EvaluationType, WebsiteAnalysis
+from backend.utils.models import PageContent, EvaluationResult, WebsiteAnalysis
 from ai.agents.ai_agents import (
     ContentQualityAgent, DesignAndLayoutAgent, AccessibilityAgent, 
     SEOAgent, TechnicalPerformanceAgent, ConversionOptimizationAgent,
@@ -20,20 +21,25 @@ from ai.agents.ai_agents import (
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1)
+def _shared_agents() -> Dict[str, Any]:
+    """Agents hold no per-run state, so one set is shared by every evaluation system in the process"""
+    return {
+        'content_quality': ContentQualityAgent(),
+        'design_layout': DesignAndLayoutAgent(),
+        'accessibility': AccessibilityAgent(),
+        'seo': SEOAgent(),
+        'technical': TechnicalPerformanceAgent(),
+        'conversion': ConversionOptimizationAgent(),
+        'security': SecurityAgent(),
+        'brand_consistency': BrandConsistencyAgent()
+    }
+
 class MultiAgentEvaluationSystem:
     """Orchestrates multiple AI agents for comprehensive website evaluation"""
     
     def __init__(self):
-        self.agents = {
-            'content_quality': ContentQualityAgent(),
-            'design_layout': DesignAndLayoutAgent(),
-            'accessibility': AccessibilityAgent(),
-            'seo': SEOAgent(),
-            'technical': TechnicalPerformanceAgent(),
-            'conversion': ConversionOptimizationAgent(),
-            'security': SecurityAgent(),
-            'brand_consistency': BrandConsistencyAgent()
-        }
+        self.agents = _shared_agents()
         
         self.evaluation_weights = {
             'content_quality': 0.20,
@@ -50,39 +56,27 @@ class MultiAgentEvaluationSystem:
         """Evaluate a single page with all agents"""
         logger.info(f"Starting multi-agent evaluation for {page.url}")
         
-        # Create evaluation tasks for all agents
-        tasks = []
-        agent_names = []
-        
+        # Agent failures come back as error results (see safe_evaluate), never as exceptions
+        evaluation_results = []
         for agent_name, agent in self.agents.items():
             if agent_name == 'design_layout' and screenshot:
                 # Special handling for design agent with screenshot
-                result = agent.evaluate(page, context="", screenshot=screenshot)
+                evaluation_results.append(agent.evaluate_sync(page, context="", screenshot=screenshot))
             else:
-                result = agent.evaluate(page)
-            
-            tasks.append(result)
-            agent_names.append(agent_name)
+                evaluation_results.append(agent.evaluate_sync(page))
         
-        # Results are already completed since they're synchronous
-        results = tasks
+        logger.info(f"Completed multi-agent evaluation for {page.url}")
+        return evaluation_results
+    
+    async def evaluate_page_async(self, page: PageContent, screenshot: Optional[str] = None) -> List[EvaluationResult]:
+        """Evaluate a single page with all agents concurrently, overlapping their I/O waits"""
+        logger.info(f"Starting multi-agent evaluation for {page.url}")
         
-        # Process results
-        evaluation_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Error in {agent_names[i]} agent: {result}")
-                # Create error result
-                error_result = EvaluationResult(
-                    url=page.url,
-                    evaluation_type=EvaluationType.CONTENT_QUALITY,
-                    score=0,
-                    issues=[f"Agent error: {str(result)}"],
-                    evaluator_agent=agent_names[i]
-                )
-                evaluation_results.append(error_result)
-            else:
-                evaluation_results.append(result)
+        evaluation_results = list(await asyncio.gather(*[
+            agent.evaluate(page, context="", screenshot=screenshot)
+            if agent_name == 'design_layout' and screenshot else agent.evaluate(page)
+            for agent_name, agent in self.agents.items()
+        ]))
         
         logger.info(f"Completed multi-agent evaluation for {page.url}")
         return evaluation_results
@@ -96,7 +90,7 @@ class MultiAgentEvaluationSystem:
         # Evaluate each page
         for page in analysis.pages:
             screenshot = screenshots.get(page.url) if screenshots else None
-            page_evaluations = self.evaluate_page(page, screenshot)
+            page_evaluations = await self.evaluate_page_async(page, screenshot)
             all_evaluations.extend(page_evaluations)
         
         # Add evaluations to analysis
@@ -43,10 +43,17 @@ class WebsiteInsightsPlatform:
         self.change_detector = ChangeDetector()
     
     async def analyze_website(self, url: str, max_depth: int = None, include_screenshots: bool = False, max_pages_to_crawl: int = None, max_links_to_validate: int = None,
-                             extract_static: bool = True, extract_dynamic: bool = False, extract_resources: bool = False, extract_external: bool = False) -> Dict[str, Any]:
+                             extract_static: bool = True, extract_dynamic: bool = False, extract_resources: bool = False, extract_external: bool = False,
+                             enable_ai_evaluation: bool = None, max_ai_evaluation_pages: int = None) -> Dict[str, Any]:
         """Main method to analyze a website comprehensively"""
         logger.info(f"Starting comprehensive analysis of {url}")
         
+        # Per-run options fall back to the process-wide settings
+        if enable_ai_evaluation is None:
+            enable_ai_evaluation = settings.enable_ai_evaluation
+        if max_ai_evaluation_pages is None:
+            max_ai_evaluation_pages = settings.max_ai_evaluation_pages
+        
         # Connect to MongoDB if enabled
         if settings.enable_mongodb_storage:
             try:
@@ -99,10 +106,10 @@ class WebsiteInsightsPlatform:
                 await self._save_to_mongodb_and_detect_changes(url, crawl_results, processed_pages, analysis)
             
             # Step 6: Run AI evaluations (limited to configured number of pages)
-            if settings.enable_ai_evaluation:
-                logger.info(f"Step 5: Running AI evaluations on {min(settings.max_ai_evaluation_pages, len(processed_pages))} pages...")
+            if enable_ai_evaluation:
+                logger.info(f"Step 5: Running AI evaluations on {min(max_ai_evaluation_pages, len(processed_pages))} pages...")
                 # Select pages for AI evaluation (prioritize content pages)
-                pages_for_ai = self._select_pages_for_ai_evaluation(processed_pages)
+                pages_for_ai = self._select_pages_for_ai_evaluation(processed_pages, max_ai_evaluation_pages)
                 analysis.pages = pages_for_ai  # Temporarily limit for AI evaluation
                 
                 screenshots = await self._capture_screenshots(pages_for_ai) if include_screenshots else None
@@ -335,18 +342,21 @@ class WebsiteInsightsPlatform:
         except Exception as e:
             logger.error(f"Failed to save to MongoDB or detect changes: {e}")
     
-    def _select_pages_for_ai_evaluation(self, pages: list) -> list:
+    def _select_pages_for_ai_evaluation(self, pages: list, max_pages: int = None) -> list:
         """Select pages for AI evaluation, prioritizing content pages"""
+        if max_pages is None:
+            max_pages = settings.max_ai_evaluation_pages
+        
         # Prioritize pages with actual content
         content_pages = [p for p in pages if p.page_type.value == 'content' and p.word_count > 100]
         other_pages = [p for p in pages if p not in content_pages]
         
         # Take up to max_ai_evaluation_pages, prioritizing content pages
-        selected_pages = content_pages[:settings.max_ai_evaluation_pages]
+        selected_pages = content_pages[:max_pages]
         
         # If we need more pages, add from other pages
-        if len(selected_pages) < settings.max_ai_evaluation_pages:
-            remaining_slots = settings.max_ai_evaluation_pages - len(selected_pages)
+        if len(selected_pages) < max_pages:
+            remaining_slots = max_pages - len(selected_pages)
             selected_pages.extend(other_pages[:remaining_slots])
         
         logger.info(f"Selected {len(selected_pages)} pages for AI evaluation: {len(content_pages)} content pages, {len(selected_pages) - len(content_pages)} other pages")
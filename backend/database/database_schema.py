@@ -3,14 +3,23 @@ Database schema for FastAPI website analysis platform
 """
 
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING, DESCENDING, IndexModel
-from bson import ObjectId
-from typing import Optional, List
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReplaceOne
+from pymongo.write_concern import WriteConcern
+from bson import Binary, ObjectId
+from typing import Dict, Optional, List
 from datetime import datetime
 import logging
+import orjson
+import zlib
+
+from ..utils.hashing import content_fingerprint, json_fingerprint
+from ..api.api_models import ParentChildRelationshipsCSR
 
 logger = logging.getLogger(__name__)
 
+# Page sources larger than this are stored zlib-compressed (HTML typically shrinks 5-10x)
+SOURCE_COMPRESSION_THRESHOLD = 64_000
+
 def convert_objectid_to_str(obj):
     """Convert ObjectId fields to strings recursively"""
     if isinstance(obj, dict):
@@ -40,9 +49,12 @@ class DatabaseManager:
             # Create client with connection pooling and better settings
             self.client = AsyncIOMotorClient(
                 self.connection_string,
-                maxPoolSize=10,
-                minPoolSize=1,
-                maxIdleTimeMS=30000,
+                maxPoolSize=50,
+                minPoolSize=10,
+                maxIdleTimeMS=60000,
+                # Wire compression for the large result/link documents; zlib is the always-available fallback
+                compressors="zstd,zlib",
+                retryWrites=True,
                 serverSelectionTimeoutMS=5000,
                 connectTimeoutMS=10000,
                 socketTimeoutMS=20000
@@ -55,6 +67,7 @@ class DatabaseManager:
             
             # Create indexes
             await self._create_indexes()
+            await self._migrate_schedule_next_run()
             
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
@@ -78,6 +91,7 @@ class DatabaseManager:
             # Applications collection indexes
             await self.db.applications.create_indexes([
                 IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+                IndexModel([("user_id", ASCENDING), ("is_active", ASCENDING)]),
                 IndexModel([("website_url", ASCENDING)]),
                 IndexModel([("is_active", ASCENDING)])
             ])
@@ -92,6 +106,7 @@ class DatabaseManager:
             # Analysis runs collection indexes
             await self.db.analysis_runs.create_indexes([
                 IndexModel([("application_id", ASCENDING), ("created_at", DESCENDING)]),
+                IndexModel([("application_id", ASCENDING), ("started_at", DESCENDING)]),
                 IndexModel([("status", ASCENDING)]),
                 IndexModel([("started_at", DESCENDING)])
             ])
@@ -132,6 +147,11 @@ class DatabaseManager:
                 IndexModel([("created_at", DESCENDING)])
             ])
             
+            # Revoked tokens are dropped by Mongo once the token would have expired anyway
+            await self.db.revoked_tokens.create_indexes([
+                IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)
+            ])
+            
             logger.info("Database indexes created successfully")
             
         except Exception as e:
@@ -141,19 +161,58 @@ class DatabaseManager:
             else:
                 logger.error(f"Failed to create indexes: {e}")
     
+    async def _migrate_schedule_next_run(self):
+        """Convert legacy isoformat-string next_run values to BSON dates so due-time range queries match them"""
+        try:
+            result = await self.db.schedules.update_many(
+                {"next_run": {"$type": "string"}},
+                [{"$set": {"next_run": {"$dateFromString": {"dateString": "$next_run", "onError": "$next_run"}}}}]
+            )
+            if result.modified_count:
+                logger.info(f"Converted next_run to a date on {result.modified_count} schedules")
+        except Exception as e:
+            logger.error(f"Failed to migrate schedule next_run values: {e}")
+    
     # User operations
     async def create_user(self, user_data: dict) -> str:
         """Create a new user"""
         result = await self.db.users.insert_one(user_data)
         return str(result.inserted_id)
     
+    @staticmethod
+    def _with_id_str(user: Optional[dict]) -> Optional[dict]:
+        """Attach the hex form of the user's ObjectId once, as id_str"""
+        if user is not None:
+            user["id_str"] = str(user["_id"])
+        return user
+    
     async def get_user_by_email(self, email: str) -> Optional[dict]:
         """Get user by email"""
-        return await self.db.users.find_one({"email": email})
+        return self._with_id_str(await self.db.users.find_one({"email": email}))
     
     async def get_user_by_id(self, user_id: str) -> Optional[dict]:
         """Get user by ID"""
-        return await self.db.users.find_one({"_id": user_id})
+        return self._with_id_str(await self.db.users.find_one({"_id": user_id}))
+    
+    async def revoke_token(self, token_id: str, expires_at: datetime) -> None:
+        """Add a token to the revocation list until expires_at"""
+        await self.db.revoked_tokens.update_one(
+            {"_id": token_id},
+            {"$setOnInsert": {"expires_at": expires_at}},
+            upsert=True
+        )
+    
+    async def is_token_revoked(self, token_id: str) -> bool:
+        """Check whether a token has been revoked"""
+        return await self.db.revoked_tokens.find_one({"_id": token_id}, {"_id": 1}) is not None
+    
+    async def update_user_password_hash(self, user_id, password_hash: str) -> bool:
+        """Replace a user's stored password hash"""
+        result = await self.db.users.update_one(
+            {"_id": user_id},
+            {"$set": {"password_hash": password_hash}}
+        )
+        return result.modified_count > 0
     
     # Application operations
     async def create_application(self, app_data: dict) -> str:
@@ -161,12 +220,12 @@ class DatabaseManager:
         result = await self.db.applications.insert_one(app_data)
         return str(result.inserted_id)
     
-    async def get_user_applications(self, user_id: str) -> list:
-        """Get all applications for a user"""
+    async def get_user_applications(self, user_id: str, fields: Optional[dict] = None) -> list:
+        """Get all applications for a user; fields is an optional Mongo projection"""
         # Convert string user_id to ObjectId for query
         if isinstance(user_id, str):
             user_id = ObjectId(user_id)
-        cursor = self.db.applications.find({"user_id": user_id, "is_active": True})
+        cursor = self.db.applications.find({"user_id": user_id, "is_active": True}, projection=fields)
         applications = await cursor.to_list(length=None)
         return convert_objectid_to_str(applications)
     
@@ -178,6 +237,15 @@ class DatabaseManager:
         application = await self.db.applications.find_one({"_id": app_id})
         return convert_objectid_to_str(application) if application else None
     
+    async def get_applications_by_ids(self, app_ids: List[str]) -> Dict[str, dict]:
+        """Get several applications in one query, keyed by string ID"""
+        object_ids = [ObjectId(app_id) for app_id in app_ids if ObjectId.is_valid(app_id)]
+        if not object_ids:
+            return {}
+        cursor = self.db.applications.find({"_id": {"$in": object_ids}})
+        applications = await cursor.to_list(length=None)
+        return {str(application["_id"]): convert_objectid_to_str(application) for application in applications}
+    
     async def update_application(self, app_id: str, update_data: dict) -> Optional[dict]:
         """Update application and return updated document"""
         try:
@@ -217,24 +285,51 @@ class DatabaseManager:
         result = await self.db.schedules.insert_one(schedule_data)
         return str(result.inserted_id)
     
-    async def get_active_schedules(self) -> list:
-        """Get all active schedules"""
-        cursor = self.db.schedules.find({"is_active": True})
+    async def get_active_schedules(self, due_before: Optional[datetime] = None) -> list:
+        """Get active schedules, only those with next_run at or before due_before when given"""
+        query = {"is_active": True}
+        if due_before is not None:
+            # Served by the (is_active, next_run) index
+            query["next_run"] = {"$lte": due_before}
+        cursor = self.db.schedules.find(query)
         return await cursor.to_list(length=None)
     
+    async def get_next_schedule_run(self) -> Optional[datetime]:
+        """Get the earliest next_run among active schedules"""
+        schedule = await self.db.schedules.find_one(
+            {"is_active": True, "next_run": {"$type": "date"}},
+            {"next_run": 1},
+            sort=[("next_run", ASCENDING)]
+        )
+        return schedule["next_run"] if schedule else None
+    
     async def get_application_schedules(self, app_id: str) -> list:
         """Get schedules for an application"""
         cursor = self.db.schedules.find({"application_id": app_id})
         return await cursor.to_list(length=None)
     
-    async def update_schedule_next_run(self, schedule_id: str, next_run: str) -> bool:
+    async def update_schedule_next_run(self, schedule_id: str, next_run: datetime) -> bool:
         """Update schedule next run time"""
+        # Convert string schedule_id to ObjectId for query
+        if isinstance(schedule_id, str):
+            schedule_id = ObjectId(schedule_id)
         result = await self.db.schedules.update_one(
             {"_id": schedule_id}, 
             {"$set": {"next_run": next_run}}
         )
         return result.modified_count > 0
     
+    async def update_schedule_empty_runs(self, schedule_id: str, consecutive_empty_runs: int) -> bool:
+        """Record how many runs in a row a schedule has come back with no pages"""
+        # Convert string schedule_id to ObjectId for query
+        if isinstance(schedule_id, str):
+            schedule_id = ObjectId(schedule_id)
+        result = await self.db.schedules.update_one(
+            {"_id": schedule_id},
+            {"$set": {"consecutive_empty_runs": consecutive_empty_runs}}
+        )
+        return result.modified_count > 0
+    
     # Analysis run operations
     async def create_analysis_run(self, run_data: dict) -> str:
         """Create a new analysis run"""
@@ -260,15 +355,17 @@ class DatabaseManager:
         
         return convert_objectid_to_str(runs)
     
-    async def get_all_analysis_runs_for_user(self, user_id: str, limit: int = 50) -> List[dict]:
-        """Get all analysis runs for a user across all applications"""
-        # Get user's applications
-        applications = await self.get_user_applications(user_id)
+    async def get_all_analysis_runs_for_user(
+        self, user_id: str, limit: int = 50, fields: Optional[dict] = None
+    ) -> List[dict]:
+        """Get all analysis runs for a user across all applications; fields is an optional Mongo projection"""
+        # Get user's application IDs
+        applications = await self.get_user_applications(user_id, fields={"_id": 1})
         app_ids = [app["_id"] for app in applications]
         
         # Get analysis runs for all applications
         cursor = self.db.analysis_runs.find(
-            {"application_id": {"$in": app_ids}}
+            {"application_id": {"$in": app_ids}}, projection=fields
         ).sort("started_at", DESCENDING).limit(limit)
         runs = await cursor.to_list(length=limit)
         
@@ -375,7 +472,7 @@ class DatabaseManager:
     async def save_analysis_results(self, results: list) -> int:
         """Save analysis results"""
         if results:
-            result = await self.db.analysis_results.insert_many(results)
+            result = await self.db.analysis_results.insert_many(results, ordered=False)
             return len(result.inserted_ids)
         return 0
     
@@ -396,7 +493,7 @@ class DatabaseManager:
     async def save_link_validations(self, validations: list) -> int:
         """Save link validations"""
         if validations:
-            result = await self.db.link_validations.insert_many(validations)
+            result = await self.db.link_validations.insert_many(validations, ordered=False)
             return len(result.inserted_ids)
         return 0
     
@@ -426,8 +523,8 @@ class DatabaseManager:
     # Dashboard operations
     async def get_dashboard_stats(self, user_id: str) -> dict:
         """Get dashboard statistics for a user"""
-        # Get user's applications
-        applications = await self.get_user_applications(user_id)
+        # Get user's application IDs
+        applications = await self.get_user_applications(user_id, fields={"_id": 1})
         app_ids = [app["_id"] for app in applications]
         
         # Count total runs
@@ -476,10 +573,15 @@ class DatabaseManager:
     async def save_page_data(self, page_data: dict) -> str:
         """Save page data to MongoDB with enhanced content storage"""
         # Ensure we have proper content structure for comparison
+        html_content = page_data.get("html_content", "")
+        text_content = page_data.get("text_content", "")
         enhanced_page_data = {
             **page_data,
-            "html_content": page_data.get("html_content", ""),
-            "text_content": page_data.get("text_content", ""),
+            "html_content": html_content,
+            "text_content": text_content,
+            "html_hash": content_fingerprint(html_content),
+            "text_hash": content_fingerprint(text_content),
+            "ai_analysis_hash": json_fingerprint(page_data.get("ai_analysis")),
             "html_structure": page_data.get("html_structure", {}),
             "content_chunks": page_data.get("content_chunks", []),
             "page_url": page_data.get("page_url", ""),
@@ -529,12 +631,15 @@ class DatabaseManager:
             comparison_engine = ComparisonEngine()
             
             # Perform AI-powered comparison
-            comparison_result = await comparison_engine.compare_analysis_runs(
-                current_analysis, previous_analysis
-            )
+            try:
+                comparison_result = await comparison_engine.compare_analysis_runs(
+                    current_analysis, previous_analysis
+                )
+            finally:
+                await comparison_engine.aclose()
             
             # Convert to dict format
-            return comparison_result.dict()
+            return comparison_result.to_dict()
             
         except Exception as e:
             logger.error(f"Error in AI content comparison: {e}")
@@ -559,7 +664,7 @@ class DatabaseManager:
                     
                     # Compare word counts and content
                     if (current_page.get("word_count", 0) != previous_page.get("word_count", 0) or
-                        current_page.get("ai_analysis") != previous_page.get("ai_analysis")):
+                        self._ai_analysis_hash(current_page) != self._ai_analysis_hash(previous_page)):
                         modified_pages.append({
                             "url": url,
                             "title": current_page.get("page_title", ""),
@@ -584,6 +689,11 @@ class DatabaseManager:
                 "impact_analysis": "Unable to generate AI insights due to technical error",
                 "recommendations": ["Fix technical issues and retry comparison"]
             }
+    
+    @staticmethod
+    def _ai_analysis_hash(page: dict) -> str:
+        """Return the page's stored ai_analysis hash, computing it for pages saved without one"""
+        return page.get("ai_analysis_hash") or json_fingerprint(page.get("ai_analysis"))
 
     # Parent-child relationship operations
     async def save_parent_child_relationships(self, run_id: str, relationships: dict) -> bool:
@@ -592,16 +702,20 @@ class DatabaseManager:
             logger.info(f"Saving parent-child relationships for run_id: {run_id}")
             logger.info(f"Relationships data keys: {list(relationships.keys())}")
             
+            # The graph is stored columnar (CSR) rather than as URL-keyed dicts of lists
+            graph = ParentChildRelationshipsCSR.from_maps(
+                relationships.get("parent_map", {}),
+                relationships.get("children_map", {})
+            )
             relationship_data = {
                 "run_id": run_id,
                 "start_url": relationships.get("start_url"),
-                "parent_map": relationships.get("parent_map", {}),
-                "children_map": {k: list(v) for k, v in relationships.get("children_map", {}).items()},
+                "graph": graph.model_dump(),
                 "path_map": relationships.get("path_map", {}),
                 "created_at": datetime.utcnow()
             }
             
-            logger.info(f"Relationship data to save with {len(relationship_data['parent_map'])} parent mappings")
+            logger.info(f"Relationship data to save with {len(graph.urls)} urls and {len(graph.child_indices)} edges")
             
             # Upsert the relationships
             result = await self.db.parent_child_relationships.replace_one(
@@ -622,6 +736,10 @@ class DatabaseManager:
             logger.info(f"Getting parent-child relationships for run_id: {run_id}")
             result = await self.db.parent_child_relationships.find_one({"run_id": run_id})
             if result:
+                # Project the columnar graph back to the dict shape callers use; older runs stored the dicts directly
+                graph = result.pop("graph", None)
+                if graph is not None:
+                    result["parent_map"], result["children_map"] = ParentChildRelationshipsCSR.model_construct(**graph).to_maps()
                 logger.info(f"Found parent-child relationships with {len(result.get('parent_map', {}))} parent mappings")
                 
                 # Filter out None values from parent_map
@@ -645,6 +763,53 @@ class DatabaseManager:
             return None
     
     # Source code storage operations
+    @staticmethod
+    def _source_code_document(run_id: str, page_url: str, source_code: str, parent_url: str = None) -> dict:
+        """Build a page_source_codes document, compressing large sources and truncating past the 16MB limit"""
+        if len(source_code) > 15 * 1024 * 1024:  # 15MB limit for safety
+            logger.warning(f"Source code too large ({len(source_code)} bytes) for {page_url}, truncating...")
+            source_code = source_code[:15 * 1024 * 1024] + "\n<!-- TRUNCATED DUE TO SIZE -->"
+        
+        document = {
+            "run_id": run_id,
+            "page_url": page_url,
+            "parent_url": parent_url,
+            "created_at": datetime.utcnow(),
+            "content_length": len(source_code)
+        }
+        if len(source_code) > SOURCE_COMPRESSION_THRESHOLD:
+            document["source_code_zlib"] = Binary(zlib.compress(source_code.encode("utf-8"), 3))
+            document["encoding"] = "zlib"
+        else:
+            document["source_code"] = source_code
+        return document
+    
+    async def _resolve_source_code(self, run_id: str, document: Optional[dict]) -> Optional[dict]:
+        """Follow a deduplicated pointer row to the stored source and inflate it"""
+        if document is None:
+            return None
+        source_ref = document.get("source_ref")
+        if source_ref:
+            target = await self.db.page_source_codes.find_one({"run_id": run_id, "page_url": source_ref})
+            if not target:
+                logger.warning(f"Source code reference {source_ref} for {document.get('page_url')} is missing")
+                return None
+            document = {
+                **self._inflate_source_code(target),
+                "page_url": document["page_url"],
+                "parent_url": document.get("parent_url"),
+                "actual_source_page": source_ref
+            }
+        return self._inflate_source_code(document)
+    
+    @staticmethod
+    def _inflate_source_code(document: dict) -> dict:
+        """Restore source_code on a page_source_codes document stored compressed"""
+        if document.get("encoding") == "zlib":
+            document["source_code"] = zlib.decompress(document.pop("source_code_zlib")).decode("utf-8")
+            del document["encoding"]
+        return document
+    
     async def save_page_source_code(self, run_id: str, page_url: str, source_code: str, parent_url: str = None) -> bool:
         """Save HTML source code for a page"""
         try:
@@ -653,19 +818,7 @@ class DatabaseManager:
                 logger.error("Database connection is None!")
                 return False
             
-            # Check if source code is too large (MongoDB has a 16MB document limit)
-            if len(source_code) > 15 * 1024 * 1024:  # 15MB limit for safety
-                logger.warning(f"Source code too large ({len(source_code)} bytes) for {page_url}, truncating...")
-                source_code = source_code[:15 * 1024 * 1024] + "\n<!-- TRUNCATED DUE TO SIZE -->"
-            
-            source_data = {
-                "run_id": run_id,
-                "page_url": page_url,
-                "source_code": source_code,
-                "parent_url": parent_url,
-                "created_at": datetime.utcnow(),
-                "content_length": len(source_code)
-            }
+            source_data = self._source_code_document(run_id, page_url, source_code, parent_url)
             
             # Use replace_one with upsert=True to handle duplicate key errors
             # This will either insert a new record or update an existing one
@@ -691,6 +844,40 @@ class DatabaseManager:
             logger.error(f"Error type: {type(e).__name__}")
             return False
     
+    async def save_page_source_codes(self, run_id: str, sources: list, batch_size: int = 1000) -> int:
+        """Upsert many (page_url, source_code, parent_url) sources with unordered bulk writes; returns pages saved"""
+        if self.db is None:
+            logger.error("Database connection is None!")
+            return 0
+        
+        # Analytics data: acknowledged by the primary only
+        collection = self.db.page_source_codes.with_options(write_concern=WriteConcern(w=1))
+        # Pages serving identical HTML store it once; later ones get a pointer row to the first
+        first_url_by_fingerprint = {}
+        saved = 0
+        for start in range(0, len(sources), batch_size):
+            ops = []
+            for page_url, source_code, parent_url in sources[start:start + batch_size]:
+                first_url = first_url_by_fingerprint.setdefault(content_fingerprint(source_code), page_url)
+                if first_url == page_url:
+                    document = self._source_code_document(run_id, page_url, source_code, parent_url)
+                else:
+                    document = {
+                        "run_id": run_id,
+                        "page_url": page_url,
+                        "parent_url": parent_url,
+                        "source_ref": first_url,
+                        "created_at": datetime.utcnow(),
+                        "content_length": len(source_code)
+                    }
+                ops.append(ReplaceOne({"run_id": run_id, "page_url": page_url}, document, upsert=True))
+            try:
+                result = await collection.bulk_write(ops, ordered=False)
+                saved += result.upserted_count + result.matched_count
+            except Exception as e:
+                logger.error(f"Error bulk saving {len(ops)} page source codes: {e}")
+        return saved
+    
     async def get_page_source_code(self, run_id: str, page_url: str) -> Optional[dict]:
         """Get HTML source code for a page - optimized with hierarchical parent traversal"""
         try:
@@ -700,6 +887,7 @@ class DatabaseManager:
                 "page_url": page_url
             })
             
+            result = await self._resolve_source_code(run_id, result)
             if result:
                 logger.info(f"Found direct source code for {page_url}, content length: {len(result.get('source_code', ''))}")
                 return result
@@ -743,6 +931,7 @@ class DatabaseManager:
                             "page_url": parent_url
                         })
                         
+                        parent_result = await self._resolve_source_code(run_id, parent_result)
                         if parent_result:
                             # Filter out None values from traversal path
                             clean_traversal_path = [url for url in traversal_path if url is not None]
@@ -842,7 +1031,6 @@ class DatabaseManager:
     async def export_analysis_results_to_json(self, run_id: str) -> str:
         """Export complete analysis results to JSON file for debugging and verification"""
         try:
-            import json
             import os
             from datetime import datetime
             
@@ -957,8 +1145,12 @@ class DatabaseManager:
             os.makedirs("analysis_exports", exist_ok=True)
             
             # Write JSON file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False, default=str)
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(
+                    export_data,
+                    default=str,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+                ))
             
             logger.info(f"Analysis results exported to: {filepath}")
             logger.info(f"Export contains: {len(results or [])} pages, {len(link_validations or [])} links, {len(source_codes)} source codes")
@@ -9,6 +9,7 @@ import sys
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
 from celery import current_task
+from celery.signals import worker_init
 
 # Add project root to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,15 +17,21 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from backend.tasks.celery_app import celery_app
-from backend.core.analysis_engine import AnalysisEngine
+from backend.core.analysis_engine import AnalysisEngine, next_scheduled_run
 from backend.database.database_schema import get_database
 import openai
 from backend.utils.config import settings
 from ai.models.content_analyzer import ContentAnalyzer
 from ai.models.comparison_engine import ComparisonEngine
+from ai.models.ai_models import rebuild_ai_models
 
 logger = logging.getLogger(__name__)
 
+@worker_init.connect
+def prebuild_ai_models(**kwargs):
+    """Build the deferred AI model schemas once, before the worker takes tasks"""
+    rebuild_ai_models()
+
 @celery_app.task(bind=True, name="celery_tasks.run_website_analysis")
 def run_website_analysis(self, run_id: str, application_data: Dict[str, Any]):
     """
@@ -140,7 +147,7 @@ async def _run_analysis_async(task, run_id: str, application_data: Dict[str, Any
         # Run analysis
         logger.info(f"Starting analysis for run {run_id}")
         logger.info(f"Application data received: {application_data}")
-        analysis_engine = AnalysisEngine()
+        analysis_engine = AnalysisEngine(db=db)
         logger.info(f"Analysis engine created successfully")
         
         results = await analysis_engine.analyze_website(
@@ -164,18 +171,31 @@ async def _run_analysis_async(task, run_id: str, application_data: Dict[str, Any
         
         # Save results to database
         logger.info(f"About to call save_results_to_db for run_id: {run_id}")
-        await analysis_engine.save_results_to_db(db, run_id, results)
+        saved = await analysis_engine.save_results_to_db(
+            db, run_id, results,
+            persist_valid_links=application_data.get("persist_valid_links", False)
+        )
         logger.info(f"Completed save_results_to_db for run_id: {run_id}")
         
+        # Scheduled runs track empty crawls so the next run can be backed off
+        schedule_id = application_data.get("schedule_id")
+        if schedule_id is not None:
+            empty_runs = 0 if saved else application_data.get("consecutive_empty_runs", 0) + 1
+            await db.update_schedule_empty_runs(schedule_id, empty_runs)
+            # Re-apply the backoff now that this run's outcome is known
+            next_run = next_scheduled_run(application_data["schedule_frequency"], empty_runs)
+            await db.update_schedule_next_run(schedule_id, next_run)
+        
         # Update run status to completed
+        summary = results.get("summary") or {}
         await db.update_analysis_run(run_id, {
-            "status": "completed",
+            "status": "completed" if saved else "completed-empty",
             "completed_at": datetime.utcnow(),
-            "total_pages_analyzed": results.get("summary", {}).get("total_pages_analyzed", 0),
-            "total_links_found": results.get("summary", {}).get("total_links_found", 0),
-            "broken_links_count": results.get("summary", {}).get("broken_links", 0),
-            "blank_pages_count": results.get("summary", {}).get("blank_pages", 0),
-            "content_pages_count": results.get("summary", {}).get("content_pages", 0),
+            "total_pages_analyzed": summary.get("total_pages_analyzed", 0),
+            "total_links_found": summary.get("total_links_found", 0),
+            "broken_links_count": summary.get("broken_links", 0),
+            "blank_pages_count": summary.get("blank_pages", 0),
+            "content_pages_count": summary.get("content_pages", 0),
             "overall_score": results.get("overall_score", 0)
         })
         
@@ -302,13 +322,7 @@ async def _process_scheduled_analyses_async():
     
     try:
         # Get schedules that need to run
-        now = datetime.utcnow()
-        schedules = await db.get_active_schedules()
-        
-        schedules_to_run = []
-        for schedule in schedules:
-            if schedule.get("next_run") and schedule["next_run"] <= now:
-                schedules_to_run.append(schedule)
+        schedules_to_run = await db.get_active_schedules(due_before=datetime.utcnow())
         
         if not schedules_to_run:
             return {"message": "No schedules to run", "count": 0}
@@ -344,6 +358,10 @@ async def _process_scheduled_analyses_async():
                     "max_links_to_validate": application["max_links_to_validate"],
                     "enable_ai_evaluation": application["enable_ai_evaluation"],
                     "max_ai_evaluation_pages": application["max_ai_evaluation_pages"],
+                    "persist_valid_links": application.get("persist_valid_links", False),
+                    "schedule_id": str(schedule["_id"]),
+                    "schedule_frequency": schedule["frequency"],
+                    "consecutive_empty_runs": schedule.get("consecutive_empty_runs", 0),
                     "name": application["name"],
                     "user_email": user["email"] if user else None,
                     "send_notifications": True  # Enable notifications for scheduled runs
@@ -376,23 +394,8 @@ async def _process_scheduled_analyses_async():
 
 async def _update_next_run_time(db, schedule: Dict[str, Any]):
     """Update next run time for a schedule"""
-    from datetime import timedelta
-    
-    frequency = schedule["frequency"]
-    now = datetime.utcnow()
-    
-    if frequency == "daily":
-        next_run = now + timedelta(days=1)
-    elif frequency == "weekly":
-        next_run = now + timedelta(weeks=1)
-    elif frequency == "monthly":
-        next_run = now + timedelta(days=30)
-    else:
-        # For custom schedules, you would parse the cron expression
-        # For now, default to daily
-        next_run = now + timedelta(days=1)
-    
-    await db.update_schedule_next_run(schedule["_id"], next_run.isoformat())
+    next_run = next_scheduled_run(schedule["frequency"], schedule.get("consecutive_empty_runs", 0))
+    await db.update_schedule_next_run(schedule["_id"], next_run)
 
 @celery_app.task(name="celery_tasks.send_notification")
 def send_notification(email: str, subject: str, message: str):
@@ -649,6 +652,7 @@ async def _run_content_analysis_async(task, run_id: str):
         raise Exception("OpenAI API key not configured")
     
     analyzer = ContentAnalyzer()
+    await analyzer.warmup()
     
     # Prepare page data for analysis
     pages_data = []
@@ -672,10 +676,13 @@ async def _run_content_analysis_async(task, run_id: str):
     )
     
     # Analyze all pages with AI
-    content_analysis_results = await analyzer.analyze_multiple_pages(pages_data)
+    try:
+        content_analysis_results = await analyzer.analyze_multiple_pages(pages_data)
+    finally:
+        await analyzer.aclose()
     
     # Convert to dict format for storage
-    analysis_results = [result.dict() for result in content_analysis_results]
+    analysis_results = [result.to_dict() for result in content_analysis_results]
     
     task.update_state(
         state="PROGRESS",
@@ -23,10 +23,25 @@ class Settings(BaseSettings):
     # OpenAI API Key (Required for AI evaluation)
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     
+    # Chat model for page analysis and run comparison (text-only JSON scoring)
+    openai_model: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    
+    # OpenAI response cache (SQLite file by default, Redis when LLM_CACHE_REDIS_URL is set)
+    enable_llm_cache: bool = os.getenv("ENABLE_LLM_CACHE", "true").lower() == "true"
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+    llm_cache_redis_url: str = os.getenv("LLM_CACHE_REDIS_URL", "")
+    llm_cache_ttl: int = int(os.getenv("LLM_CACHE_TTL", str(7 * 86400)))
+    
     # Database Settings (Required for production)
     mongodb_uri: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017/website_analysis_platform")
     enable_mongodb_storage: bool = os.getenv("ENABLE_MONGODB_STORAGE", "true").lower() == "true"
     
+    # Scheduled analyses the scheduler loop runs at the same time
+    max_concurrent_scheduled_runs: int = int(os.getenv("MAX_CONCURRENT_SCHEDULED_RUNS", "4"))
+    
+    # Cap on the exponential next_run backoff (2**n intervals) for schedules that keep returning no pages
+    max_empty_run_backoff: int = int(os.getenv("MAX_EMPTY_RUN_BACKOFF", "5"))
+    
     # =============================================================================
     # CRAWLER SETTINGS (Used by crawler.py and validators.py)
     # =============================================================================
@@ -0,0 +1,16 @@
+"""
+Content fingerprinting helpers
+"""
+
+import hashlib
+import orjson
+from typing import Any, Optional
+
+def content_fingerprint(content: Optional[str]) -> str:
+    """Return a 64-bit hex digest of a text blob (empty content hashes like "")"""
+    return hashlib.blake2b((content or "").encode("utf-8"), digest_size=8).hexdigest()
+
+def json_fingerprint(value: Any) -> str:
+    """Return a 64-bit hex digest of a value's canonical JSON form"""
+    canonical = orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(canonical, digest_size=8).hexdigest()